@@ -0,0 +1,374 @@
+"""Benchmarks of the algorithms on the example problems.
+
+Usage:
+
+Run the benchmarks and write the results:
+python3 -m benchmarks.run -o results.json
+
+Run the benchmarks and compare them to previous results:
+python3 -m benchmarks.run -o results.json -b baseline.json
+
+Each benchmark solves a generated instance with one algorithm, under a fixed
+seed and a fixed time and iteration budget. Instances are generated from
+their own seed, so a given size always leads to the same instance.
+
+For each benchmark, the results contain the final cost, the number of
+iterations (or restarts) per second and the time at which each new best
+solution was found. When a baseline is given, the time to reach the final
+cost of the baseline is also reported, and the benchmark is flagged as a
+regression if:
+- its final cost is worse than the final cost of the baseline, or
+- its number of iterations per second dropped by more than the tolerance,
+  or
+- it reached the final cost of the baseline later than the baseline, by
+  more than the tolerance and more than 'TIME_RESOLUTION'.
+
+Runs which are not stopped by the time limit are deterministic, so their
+final costs are compared exactly. Runs stopped by the time limit don't
+always end with the same cost, so a cost is only considered worse if the
+difference exceeds the cost tolerance, relative to the final cost of the
+baseline; for tuple costs, it applies to the last element, if the others
+are equal. The same rule defines when the final cost of the baseline is
+reached.
+
+The script exits with status 1 if a regression is detected.
+
+"""
+
+import localsearchsolverpy
+
+from examples import knapsack
+from examples import travellingsalesman
+
+import json
+import platform
+import random
+import sys
+import time
+
+
+def generate_knapsack_instance(number_of_items, seed):
+    rng = random.Random(seed)
+    instance = knapsack.Instance()
+    total_weight = 0
+    for _ in range(number_of_items):
+        weight = rng.randint(0, 1000000)
+        profit = rng.randint(weight, weight + 10000)
+        total_weight += weight
+        instance.add_item(weight, profit)
+    instance.capacity = rng.randint(
+            total_weight * 1 // 4,
+            total_weight * 3 // 4)
+    return instance
+
+
+def generate_travellingsalesman_instance(number_of_locations, seed):
+    rng = random.Random(seed)
+    instance = travellingsalesman.Instance()
+    for _ in range(number_of_locations):
+        x = rng.randint(0, 1000)
+        y = rng.randint(0, 1000)
+        instance.add_location(x, y)
+    return instance
+
+
+PROBLEMS = {
+        "knapsack": (
+            generate_knapsack_instance,
+            knapsack.LocalScheme,
+            [100, 1000, 10000]),
+        "travellingsalesman": (
+            generate_travellingsalesman_instance,
+            travellingsalesman.LocalScheme,
+            [100, 1000, 10000]),
+}
+
+ALGORITHMS = {
+        "restarting_local_search": localsearchsolverpy.restarting_local_search,
+        "iterated_local_search": localsearchsolverpy.iterated_local_search,
+        "late_acceptance_hill_climbing": (
+            localsearchsolverpy.late_acceptance_hill_climbing),
+        "tabu_search": localsearchsolverpy.tabu_search,
+        "memetic_algorithm": localsearchsolverpy.memetic_algorithm,
+}
+
+
+def to_json_cost(cost):
+    if type(cost) == tuple:
+        return list(cost)
+    return cost
+
+
+def from_json_cost(cost):
+    if type(cost) == list:
+        return tuple(cost)
+    return cost
+
+
+def run_benchmark(problem, size, algorithm, **parameters):
+    generator, local_scheme_class, _ = PROBLEMS[problem]
+    instance = generator(size, parameters["instance_seed"])
+    local_scheme = local_scheme_class(instance)
+
+    improvements = []
+
+    def new_solution_callback(solution):
+        improvements.append((
+            time.time() - start,
+            to_json_cost(local_scheme.global_cost(solution))))
+
+    start = time.time()
+    output = ALGORITHMS[algorithm](
+            local_scheme,
+            seed=parameters["seed"],
+            time_limit=parameters["time_limit"],
+            maximum_number_of_restarts=parameters[
+                "maximum_number_of_restarts"],
+            maximum_number_of_iterations=parameters[
+                "maximum_number_of_iterations"],
+            new_solution_callback=new_solution_callback,
+            verbose=False)
+    elapsed_time = output["elapsed_time"]
+    if "number_of_iterations" in output:
+        number_of_iterations = output["number_of_iterations"]
+    else:
+        number_of_iterations = output["number_of_restarts"]
+    return {
+            "problem": problem,
+            "size": size,
+            "algorithm": algorithm,
+            "cost": to_json_cost(output["solution_pool"].best_cost),
+            "elapsed_time": elapsed_time,
+            "number_of_iterations": number_of_iterations,
+            "iterations_per_second": (
+                number_of_iterations / elapsed_time
+                if elapsed_time > 0 else None),
+            "termination": output["termination"],
+            "improvements": improvements}
+
+
+# Differences of times to target below this duration, in seconds, are
+# measurement noise.
+TIME_RESOLUTION = 0.05
+
+
+def is_worse(cost, base_cost, tolerance):
+    """Return True if 'cost' is worse than 'base_cost' by more than the
+    relative tolerance."""
+    cost = from_json_cost(cost)
+    base_cost = from_json_cost(base_cost)
+    if type(cost) == tuple:
+        if cost[:-1] != base_cost[:-1]:
+            return cost > base_cost
+        cost, base_cost = cost[-1], base_cost[-1]
+    return cost - base_cost > tolerance * abs(base_cost)
+
+
+def time_to_target(result, target, cost_tolerance):
+    for t, cost in result["improvements"]:
+        if not is_worse(cost, target, cost_tolerance):
+            return t
+    return None
+
+
+def compare(results, baseline, tolerance, cost_tolerance):
+    """Compare results to a baseline and return the list of regressions."""
+    baseline_results = {
+            (r["problem"], r["size"], r["algorithm"]): r
+            for r in baseline["results"]}
+    regressions = []
+    print()
+    print(
+            '{:<20}'.format("Problem")
+            + '{:>8}'.format("Size")
+            + '{:>31}'.format("Algorithm")
+            + '{:>12}'.format("It/s ratio")
+            + '{:>12}'.format("TTT")
+            + '{:>12}'.format("TTT base")
+            + '{:>12}'.format("Status"))
+    for result in results["results"]:
+        key = (result["problem"], result["size"], result["algorithm"])
+        if key not in baseline_results:
+            continue
+        base = baseline_results[key]
+        issues = []
+
+        # Final cost. Runs stopped by the time limit, or baselines which
+        # don't tell, are compared with the cost tolerance.
+        deterministic = (
+                result["termination"] != "time limit"
+                and base.get("termination", "time limit") != "time limit")
+        if is_worse(
+                result["cost"], base["cost"],
+                0 if deterministic else cost_tolerance):
+            issues.append("cost")
+
+        # Iterations per second.
+        ratio = None
+        if result["iterations_per_second"] and base["iterations_per_second"]:
+            ratio = (
+                    result["iterations_per_second"]
+                    / base["iterations_per_second"])
+            if ratio < 1 - tolerance:
+                issues.append("speed")
+
+        # Time to target.
+        ttt = time_to_target(result, base["cost"], cost_tolerance)
+        ttt_base = time_to_target(base, base["cost"], cost_tolerance)
+        result["time_to_target"] = ttt
+        if ttt_base is not None:
+            if ttt is None or ttt > max(
+                    ttt_base * (1 + tolerance),
+                    ttt_base + TIME_RESOLUTION):
+                issues.append("time to target")
+
+        if issues:
+            regressions.append((key, issues))
+        print(
+                '{:<20}'.format(result["problem"])
+                + '{:>8}'.format(result["size"])
+                + '{:>31}'.format(result["algorithm"])
+                + '{:>12}'.format(
+                    "-" if ratio is None else '{:.3f}'.format(ratio))
+                + '{:>12}'.format(
+                    "-" if ttt is None else '{:.3f}'.format(ttt))
+                + '{:>12}'.format(
+                    "-" if ttt_base is None else '{:.3f}'.format(ttt_base))
+                + '{:>12}'.format(
+                    "OK" if not issues else "REGRESSION"))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='')
+    parser.add_argument(
+            "-p", "--problems",
+            type=str,
+            nargs='*',
+            default=list(PROBLEMS),
+            help='')
+    parser.add_argument(
+            "-a", "--algorithms",
+            type=str,
+            nargs='*',
+            default=list(ALGORITHMS),
+            help='')
+    parser.add_argument(
+            "-s", "--sizes",
+            type=int,
+            nargs='*',
+            default=None,
+            help='')
+    parser.add_argument(
+            "-t", "--time-limit",
+            type=float,
+            default=5,
+            help='')
+    parser.add_argument(
+            "--maximum-number-of-restarts",
+            type=int,
+            default=None,
+            help='')
+    parser.add_argument(
+            "--maximum-number-of-iterations",
+            type=int,
+            default=None,
+            help='')
+    parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help='')
+    parser.add_argument(
+            "--instance-seed",
+            type=int,
+            default=0,
+            help='')
+    parser.add_argument(
+            "-o", "--output",
+            type=str,
+            default=None,
+            help='')
+    parser.add_argument(
+            "-b", "--baseline",
+            type=str,
+            default=None,
+            help='')
+    parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help='')
+    parser.add_argument(
+            "--cost-tolerance",
+            type=float,
+            default=0.02,
+            help='')
+
+    args = parser.parse_args()
+
+    parameters = {
+            "seed": args.seed,
+            "instance_seed": args.instance_seed,
+            "time_limit": args.time_limit,
+            "maximum_number_of_restarts": (
+                args.maximum_number_of_restarts
+                if args.maximum_number_of_restarts is not None
+                else float('inf')),
+            "maximum_number_of_iterations": (
+                args.maximum_number_of_iterations
+                if args.maximum_number_of_iterations is not None
+                else float('inf'))}
+
+    results = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "parameters": {
+                "seed": args.seed,
+                "instance_seed": args.instance_seed,
+                "time_limit": args.time_limit,
+                "maximum_number_of_restarts": args.maximum_number_of_restarts,
+                "maximum_number_of_iterations": (
+                    args.maximum_number_of_iterations)},
+            "results": []}
+    print(
+            '{:<20}'.format("Problem")
+            + '{:>8}'.format("Size")
+            + '{:>31}'.format("Algorithm")
+            + '{:>24}'.format("Cost")
+            + '{:>12}'.format("Time")
+            + '{:>12}'.format("It/s"))
+    for problem in args.problems:
+        sizes = args.sizes if args.sizes is not None else PROBLEMS[problem][2]
+        for size in sizes:
+            for algorithm in args.algorithms:
+                result = run_benchmark(problem, size, algorithm, **parameters)
+                results["results"].append(result)
+                cost = result["cost"]
+                if type(cost) == list:
+                    cost = ', '.join(str(x) for x in cost)
+                print(
+                        '{:<20}'.format(problem)
+                        + '{:>8}'.format(size)
+                        + '{:>31}'.format(algorithm)
+                        + '{:>24}'.format(cost)
+                        + '{:>12.3f}'.format(result["elapsed_time"])
+                        + '{:>12.1f}'.format(
+                            result["iterations_per_second"] or 0))
+
+    regressions = []
+    if args.baseline is not None:
+        with open(args.baseline) as json_file:
+            baseline = json.load(json_file)
+        regressions = compare(
+                results, baseline, args.tolerance, args.cost_tolerance)
+
+    if args.output is not None:
+        with open(args.output, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+
+    if regressions:
+        print()
+        print(f"Regressions: {len(regressions)}")
+        sys.exit(1)
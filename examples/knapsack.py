@@ -14,8 +14,12 @@ import localsearchsolverpy
 
 import json
 import random
+import time
 
-random.seed(0)
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class Item:
@@ -76,15 +80,28 @@ class Instance:
 
 
 class LocalScheme:
-    """An elementary local scheme for the Knapsack Problem.
-
-    The neighborhood consists in adding or removing an item from the knapsack.
-
-    Removing items might be required since we allow solutions to violate the
-    capacity constraint.
+    """A local scheme for the Knapsack Problem.
 
     The global cost first minimizes the over-capacity, and then maximizes the
-    profit.
+    profit. Profits are assumed to be non-negative.
+
+    The local search relies on the items sorted by decreasing profit/weight
+    ratio:
+    - While the capacity is exceeded, the items with the smallest ratios are
+      removed from the knapsack.
+    - Then, the items are swept in ratio order and each item which fits is
+      added.
+    - Once no item fits, an item of the knapsack is swapped with an item out
+      of the knapsack, and the items are swept again. Swaps are only
+      considered between the 'swap_neighborhood_size' items of the knapsack
+      with the smallest ratios and the 'swap_neighborhood_size' items out of
+      the knapsack with the largest ratios. If 'first_improvement' is set,
+      the first improving swap is applied; otherwise, the best one is
+      applied.
+
+    When NumPy is available, the sweeps and the swap neighborhood are
+    evaluated in vectorized form, and batches of restarts can be improved
+    together with 'local_search_batch'.
 
     The perturbation consists in forcing an item in or out of the solution.
     Then, in the local search, we ensure not modifying the status of the item
@@ -101,24 +118,126 @@ class LocalScheme:
 
     def __init__(self, instance, **kwargs):
         self.instance = instance
-
-    def initial_solution(self, initial_solution_id):
+        self.first_improvement = kwargs.get("first_improvement", False)
+        self.swap_neighborhood_size = kwargs.get(
+                "swap_neighborhood_size", 32)
+
+        # Items sorted by decreasing profit/weight ratio.
+        self.sorted_item_ids = sorted(
+                range(len(instance.items)),
+                key=lambda item_id: (
+                    -instance.items[item_id].profit
+                    / instance.items[item_id].weight
+                    if instance.items[item_id].weight > 0
+                    else -float('inf')))
+        self.sorted_positions = [0] * len(instance.items)
+        for pos, item_id in enumerate(self.sorted_item_ids):
+            self.sorted_positions[item_id] = pos
+        if np is not None:
+            self.sorted_item_ids_array = np.array(
+                    self.sorted_item_ids, dtype=np.intp)
+            self.sorted_weights = np.array(
+                    [instance.items[item_id].weight
+                     for item_id in self.sorted_item_ids],
+                    dtype=np.int64)
+            self.sorted_profits = np.array(
+                    [instance.items[item_id].profit
+                     for item_id in self.sorted_item_ids],
+                    dtype=np.int64)
+            self.weights = np.array(
+                    [item.weight for item in instance.items],
+                    dtype=np.int64)
+            self.profits = np.array(
+                    [item.profit for item in instance.items],
+                    dtype=np.int64)
+
+    def initial_solution(self, initial_solution_id, rng=random):
         """For each item, add it to the initial solution with probability 1/2.
         """
 
         n = len(self.instance.items)
         solution = self.Solution()
-        solution.items = [False for _ in range(n)]
+        solution.items = bytearray(n)
         solution.profit = 0
         solution.weight = 0
 
         for item_id in range(n):
-            if random.randint(0, 1) == 0:
+            if rng.randint(0, 1) == 0:
                 solution.items[item_id] = True
                 solution.profit += self.instance.items[item_id].profit
                 solution.weight += self.instance.items[item_id].weight
         return solution
 
+    def copy_solution(self, solution):
+        solution_copy = self.Solution()
+        solution_copy.items = solution.items[:]
+        solution_copy.weight = solution.weight
+        solution_copy.profit = solution.profit
+        return solution_copy
+
+    def solution_key(self, solution):
+        return bytes(solution.items)
+
+    # Translation tables between the statuses of the items and the digits
+    # of a binary number.
+    _STATUSES_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+    _DIGITS_TO_STATUSES = bytes.maketrans(b"01", b"\x00\x01")
+
+    def crossover(self, solution_1, solution_2, rng=random):
+        """Uniform crossover: the items which have the same status in both
+        parents keep it, the others are taken from one of the parents at
+        random."""
+        n = len(self.instance.items)
+        solution = self.Solution()
+        solution.items = bytearray(n)
+        solution.weight = 0
+        solution.profit = 0
+        items_1 = solution_1.items
+        items_2 = solution_2.items
+        for item_id in range(n):
+            if items_1[item_id] == items_2[item_id]:
+                status = items_1[item_id]
+            else:
+                status = rng.randint(0, 1)
+            if status:
+                solution.items[item_id] = True
+                solution.weight += self.instance.items[item_id].weight
+                solution.profit += self.instance.items[item_id].profit
+        return solution
+
+    def solution_distance(self, solution_1, solution_2):
+        """Number of items with a different status."""
+        if np is not None:
+            return int(np.count_nonzero(
+                np.frombuffer(solution_1.items, dtype=np.uint8)
+                != np.frombuffer(solution_2.items, dtype=np.uint8)))
+        return sum(
+                status_1 != status_2
+                for status_1, status_2 in zip(
+                    solution_1.items, solution_2.items))
+
+    def serialize(self, solution):
+        """Pack the statuses of the items into a bitset, item 'j' being bit
+        'j'."""
+        n = len(solution.items)
+        digits = solution.items[::-1].translate(self._STATUSES_TO_DIGITS)
+        return int(digits or b"0", 2).to_bytes((n + 7) // 8, "little")
+
+    def deserialize(self, data):
+        n = len(self.instance.items)
+        digits = format(int.from_bytes(data, "little"), f"0{n}b")
+        solution = self.Solution()
+        solution.items = bytearray(
+                digits[::-1].encode().translate(self._DIGITS_TO_STATUSES))
+        solution.weight = 0
+        solution.profit = 0
+        for item_id in range(n):
+            if solution.items[item_id]:
+                item = self.instance.items[item_id]
+                solution.weight += item.weight
+                solution.profit += item.profit
+        return solution
+
     def global_cost(self, solution):
         return (
                 # First, minimize over-capacity.
@@ -150,6 +269,56 @@ class LocalScheme:
             moves.append(move)
         return moves
 
+    def random_move(self, solution, rng=random):
+        """Return a move flipping the status of a random item."""
+        move = self.Move()
+        move.item_id = rng.randrange(len(self.instance.items))
+        return move
+
+    def cost_delta(self, solution, move):
+        item = self.instance.items[move.item_id]
+        c = self.instance.capacity
+        if solution.items[move.item_id]:
+            weight = solution.weight - item.weight
+            profit_difference = -item.profit
+        else:
+            weight = solution.weight + item.weight
+            profit_difference = item.profit
+        return (
+                max(0, weight - c) - max(0, solution.weight - c),
+                -profit_difference)
+
+    def neighbors(self, solution):
+        """Return the moves flipping the status of each item."""
+        moves = []
+        for item_id in range(len(self.instance.items)):
+            move = self.Move()
+            move.item_id = item_id
+            moves.append(move)
+        return moves
+
+    def cost_deltas(self, solution, moves):
+        if np is None:
+            return [self.cost_delta(solution, move) for move in moves]
+        c = self.instance.capacity
+        item_ids = np.fromiter(
+                (move.item_id for move in moves),
+                dtype=np.intp, count=len(moves))
+        # +1 for the items added, -1 for the items removed.
+        signs = 1 - 2 * np.frombuffer(
+                solution.items, dtype=np.uint8)[item_ids].astype(np.int64)
+        weights = solution.weight + signs * self.weights[item_ids]
+        over_capacity_differences = (
+                np.maximum(weights - c, 0) - max(0, solution.weight - c))
+        profit_differences = signs * self.profits[item_ids]
+        return list(zip(
+            over_capacity_differences.tolist(),
+            (-profit_differences).tolist()))
+
+    def move_attributes(self, solution, move):
+        # Once an item has been flipped, flipping it again is tabu.
+        return (move.item_id,)
+
     def apply_move(self, solution, move):
         # If the item is already in the solution, we remove it.
         if solution.items[move.item_id]:
@@ -162,53 +331,307 @@ class LocalScheme:
             solution.profit += self.instance.items[move.item_id].profit
             solution.weight += self.instance.items[move.item_id].weight
 
-    def local_search(self, solution, perturbation=None):
-        n = len(self.instance.items)
+    def _add_item(self, solution, item_id):
+        solution.items[item_id] = True
+        solution.profit += self.instance.items[item_id].profit
+        solution.weight += self.instance.items[item_id].weight
+
+    def _remove_item(self, solution, item_id):
+        solution.items[item_id] = False
+        solution.profit -= self.instance.items[item_id].profit
+        solution.weight -= self.instance.items[item_id].weight
+
+    def _add_items(self, solution, forced_item_id, in_sorted):
+        """Sweep the items in ratio order and add each item which fits.
+
+        'in_sorted', the statuses of the items in ratio order, is updated in
+        place.
+
+        """
+        residual = self.instance.capacity - solution.weight
+        if np is not None:
+            forced_pos = -1
+            if forced_item_id is not None:
+                forced_pos = self.sorted_positions[forced_item_id]
+            items = np.frombuffer(solution.items, dtype=np.uint8)
+            start = 0
+            while True:
+                # The items which fit are added as long as their cumulative
+                # weight fits. The sweep goes on after the first one which
+                # doesn't fit anymore, with the new residual capacity.
+                candidates = (
+                        ~in_sorted[start:]
+                        & (self.sorted_weights[start:] <= residual)
+                        & (self.sorted_profits[start:] > 0))
+                if forced_pos >= start:
+                    candidates[forced_pos - start] = False
+                positions = np.flatnonzero(candidates) + start
+                if len(positions) == 0:
+                    break
+                cumulative_weights = np.cumsum(self.sorted_weights[positions])
+                number_of_added_items = int(np.searchsorted(
+                    cumulative_weights, residual, side="right"))
+                positions_added = positions[:number_of_added_items]
+                in_sorted[positions_added] = True
+                items[self.sorted_item_ids_array[positions_added]] = True
+                weight = int(cumulative_weights[number_of_added_items - 1])
+                solution.weight += weight
+                solution.profit += int(
+                        self.sorted_profits[positions_added].sum())
+                residual -= weight
+                if number_of_added_items == len(positions):
+                    break
+                start = int(positions[number_of_added_items]) + 1
+            return
+        for item_id in self.sorted_item_ids:
+            item = self.instance.items[item_id]
+            if solution.items[item_id] or item_id == forced_item_id:
+                continue
+            if item.weight <= residual and item.profit > 0:
+                self._add_item(solution, item_id)
+                residual -= item.weight
+
+    def _best_swap(self, solution, forced_item_id, in_sorted):
+        """Return the pair (item to remove, item to add), or None if no
+        improving swap exists."""
+        residual = self.instance.capacity - solution.weight
+        k = self.swap_neighborhood_size
+        if np is not None:
+            positions_in = np.flatnonzero(in_sorted)[-k - 1:]
+            positions_out = np.flatnonzero(~in_sorted)[:k + 1]
+            if forced_item_id is not None:
+                forced_pos = self.sorted_positions[forced_item_id]
+                positions_in = positions_in[positions_in != forced_pos]
+                positions_out = positions_out[positions_out != forced_pos]
+            positions_in = positions_in[-k:]
+            positions_out = positions_out[:k]
+            if len(positions_in) == 0 or len(positions_out) == 0:
+                return None
+            # Rows: items to remove, from the smallest ratio; columns: items
+            # to add, from the largest ratio.
+            positions_in = positions_in[::-1]
+            gains = (
+                    self.sorted_profits[None, positions_out]
+                    - self.sorted_profits[positions_in, None])
+            feasible = (
+                    self.sorted_weights[None, positions_out]
+                    - self.sorted_weights[positions_in, None]
+                    <= residual)
+            gains = np.where(feasible, gains, 0)
+            if self.first_improvement:
+                pos = int(np.argmax(gains > 0))
+            else:
+                pos = int(np.argmax(gains))
+            row, column = divmod(pos, len(positions_out))
+            if gains[row, column] <= 0:
+                return None
+            return (
+                    self.sorted_item_ids[positions_in[row]],
+                    self.sorted_item_ids[positions_out[column]])
+        item_ids_in = []
+        item_ids_out = []
+        for item_id in self.sorted_item_ids:
+            if item_id == forced_item_id:
+                continue
+            if solution.items[item_id]:
+                item_ids_in.append(item_id)
+            elif len(item_ids_out) < k:
+                item_ids_out.append(item_id)
+        item_ids_in = item_ids_in[:-k - 1:-1]
+        swap_best = None
+        gain_best = 0
+        for item_id_in in item_ids_in:
+            item_in = self.instance.items[item_id_in]
+            for item_id_out in item_ids_out:
+                item_out = self.instance.items[item_id_out]
+                if item_out.weight - item_in.weight > residual:
+                    continue
+                gain = item_out.profit - item_in.profit
+                if gain > gain_best:
+                    swap_best = (item_id_in, item_id_out)
+                    gain_best = gain
+                    if self.first_improvement:
+                        return swap_best
+        return swap_best
+
+    def local_search(self, solution, perturbation=None, deadline=None):
         c = self.instance.capacity
+        # Don't change the status of the item from the perturbation.
+        forced_item_id = None
+        if perturbation is not None:
+            forced_item_id = perturbation.item_id
+
+        # Remove the items with the smallest ratios while the capacity is
+        # exceeded. Each removal of an item with a positive weight decreases
+        # the over-capacity.
+        if solution.weight > c:
+            for item_id in reversed(self.sorted_item_ids):
+                if solution.weight <= c:
+                    break
+                if solution.items[item_id] \
+                        and item_id != forced_item_id \
+                        and self.instance.items[item_id].weight > 0:
+                    self._remove_item(solution, item_id)
+        if solution.weight > c:
+            return
+
+        # Statuses of the items in ratio order, kept up to date by the moves.
+        in_sorted = None
+        if np is not None:
+            in_sorted = np.frombuffer(solution.items, dtype=np.bool_)[
+                    self.sorted_item_ids_array]
         while True:
-            # Variables that store the best move.
-            item_id_best = None
-            global_cost_best = self.global_cost(solution)
-            # Iterate over all items.
-            for item_id in range(n):
-                # Don't change the status of the item from the perturbation.
-                if perturbation is not None \
-                        and perturbation.item_id == item_id:
-                    continue
-                w = self.instance.items[item_id].weight
-                p = self.instance.items[item_id].profit
-                # Compute the cost of the solution is the move is applied.
-                # If the current solution already contains item 'item_id', we
-                # try to remove it.
-                if solution.items[item_id]:
-                    global_cost = (
-                            max(0, solution.weight - w - c),
-                            - (solution.profit - p))
-                # If the current solution doesn't contain item 'item_id', we
-                # try to add it.
-                else:
-                    global_cost = (
-                            max(0, solution.weight + w - c),
-                            - (solution.profit + p))
-                # Update best move.
-                if global_cost < global_cost_best:
-                    item_id_best = item_id
-                    global_cost_best = global_cost
-            # If an improving move has been found, we update the current
-            # solution.
-            if item_id_best is not None:
-                # If the item is already in the solution, we remove it.
-                if solution.items[item_id_best]:
-                    solution.items[item_id_best] = False
-                    solution.profit -= self.instance.items[item_id_best].profit
-                    solution.weight -= self.instance.items[item_id_best].weight
-                # If the item is not in the solution yet, we add it.
+            # Stop once the deadline of the algorithm is reached.
+            if deadline is not None and time.time() > deadline:
+                break
+            self._add_items(solution, forced_item_id, in_sorted)
+            swap = self._best_swap(solution, forced_item_id, in_sorted)
+            if swap is None:
+                break
+            self._remove_item(solution, swap[0])
+            self._add_item(solution, swap[1])
+            if in_sorted is not None:
+                in_sorted[self.sorted_positions[swap[0]]] = False
+                in_sorted[self.sorted_positions[swap[1]]] = True
+
+    # Batched restarts, used by 'restarting_local_search' with a
+    # 'batch_size' greater than 1. They require NumPy.
+    if np is not None:
+
+        def initial_solutions_batch(self, number_of_solutions, rng=random):
+            """Return random initial solutions as the rows of a 2-D boolean
+            array, entry '[i, j]' being True if item 'j' is in solution 'i'.
+            Each item is added with probability 1/2."""
+            n = len(self.instance.items)
+            generator = np.random.default_rng(rng.getrandbits(64))
+            return generator.random((number_of_solutions, n)) < 0.5
+
+        def local_search_batch(self, solutions, deadline=None):
+            """Apply 'local_search' to all the solutions of a batch at once.
+
+            Each step applies the move that 'local_search' would choose to
+            each solution which can still be improved.
+
+            """
+            n = len(self.instance.items)
+            c = self.instance.capacity
+            k = min(self.swap_neighborhood_size, n)
+            # Statuses of the items sorted by decreasing ratio.
+            in_sorted = solutions[:, self.sorted_item_ids_array].astype(
+                    np.bool_)
+            weights = in_sorted @ self.sorted_weights
+
+            # Remove the items with the smallest ratios while the capacity
+            # is exceeded. An item is removed if the knapsack is still over
+            # capacity once the items with smaller ratios have been removed.
+            over = np.flatnonzero(weights > c)
+            if len(over) > 0:
+                removable = in_sorted[over] & (self.sorted_weights > 0)
+                removable_weights = np.where(
+                        removable, self.sorted_weights, 0)
+                weights_after = np.cumsum(
+                        removable_weights[:, ::-1], axis=1)[:, ::-1]
+                removed = removable & (
+                        weights[over, None]
+                        - weights_after + removable_weights > c)
+                in_sorted[over] &= ~removed
+                weights[over] -= np.where(
+                        removed, self.sorted_weights, 0).sum(axis=1)
+
+            positions = np.arange(n)
+            rows = np.flatnonzero(weights <= c)
+            while len(rows) > 0:
+                # Stop once the deadline of the algorithm is reached.
+                if deadline is not None and time.time() > deadline:
+                    break
+
+                # Add the items which fit, sweeping them in ratio order.
+                self._add_items_batch(in_sorted, weights, rows)
+
+                # Look for an improving swap.
+                current = in_sorted[rows]
+                residual = c - weights[rows]
+                if k == 0:
+                    break
+                # Items to remove, from the smallest ratio, and items to
+                # add, from the largest ratio. Missing items are marked by
+                # -1 and n.
+                positions_in = np.where(current, positions, -1)
+                positions_in = np.sort(np.partition(
+                    positions_in, n - k, axis=1)[:, n - k:], axis=1)[:, ::-1]
+                positions_out = np.where(current, n, positions)
+                positions_out = np.sort(np.partition(
+                    positions_out, k - 1, axis=1)[:, :k], axis=1)
+                valid = (
+                        (positions_in >= 0)[:, :, None]
+                        & (positions_out < n)[:, None, :])
+                positions_in = np.maximum(positions_in, 0)
+                positions_out = np.minimum(positions_out, n - 1)
+                gains = (
+                        self.sorted_profits[positions_out][:, None, :]
+                        - self.sorted_profits[positions_in][:, :, None])
+                weight_differences = (
+                        self.sorted_weights[positions_out][:, None, :]
+                        - self.sorted_weights[positions_in][:, :, None])
+                feasible = valid & (
+                        weight_differences <= residual[:, None, None])
+                gains = np.where(feasible, gains, 0).reshape(
+                        len(rows), k * k)
+                if self.first_improvement:
+                    swaps = np.argmax(gains > 0, axis=1)
                 else:
-                    solution.items[item_id_best] = True
-                    solution.profit += self.instance.items[item_id_best].profit
-                    solution.weight += self.instance.items[item_id_best].weight
-                continue
-            break
+                    swaps = np.argmax(gains, axis=1)
+                improving = np.flatnonzero(
+                        gains[np.arange(len(rows)), swaps] > 0)
+                rows = rows[improving]
+                row, column = np.divmod(swaps[improving], k)
+                positions_in = positions_in[improving, row]
+                positions_out = positions_out[improving, column]
+                in_sorted[rows, positions_in] = False
+                in_sorted[rows, positions_out] = True
+                weights[rows] += (
+                        self.sorted_weights[positions_out]
+                        - self.sorted_weights[positions_in])
+
+            solutions[:, self.sorted_item_ids_array] = in_sorted
+
+        def _add_items_batch(self, in_sorted, weights, rows):
+            """Apply '_add_items' to the given rows of a batch."""
+            c = self.instance.capacity
+            positions = np.arange(len(self.instance.items))
+            starts = np.zeros(len(rows), dtype=np.intp)
+            while len(rows) > 0:
+                residual = c - weights[rows]
+                candidates = (
+                        ~in_sorted[rows]
+                        & (self.sorted_weights <= residual[:, None])
+                        & (self.sorted_profits > 0)
+                        & (positions >= starts[:, None]))
+                cumulative_weights = np.cumsum(
+                        np.where(candidates, self.sorted_weights, 0), axis=1)
+                fits = cumulative_weights <= residual[:, None]
+                added = candidates & fits
+                in_sorted[rows] |= added
+                weights[rows] += np.where(
+                        added, self.sorted_weights, 0).sum(axis=1)
+                # Go on after the first item which didn't fit.
+                skipped = candidates & ~fits
+                has_skipped = skipped.any(axis=1)
+                starts = np.argmax(skipped[has_skipped], axis=1) + 1
+                rows = rows[has_skipped]
+
+        def solutions_from_batch(self, solutions):
+            items = np.ascontiguousarray(solutions, dtype=np.uint8)
+            weights = (items @ self.weights).tolist()
+            profits = (items @ self.profits).tolist()
+            solutions = []
+            for row, weight, profit in zip(items, weights, profits):
+                solution = self.Solution()
+                solution.items = bytearray(row.tobytes())
+                solution.weight = weight
+                solution.profit = profit
+                solutions.append(solution)
+            return solutions
 
     def write(self, solution):
         n = len(self.instance.items)
@@ -268,6 +691,18 @@ if __name__ == "__main__":
             output = localsearchsolverpy.iterated_local_search(
                     local_scheme,
                     time_limit=10)
+        elif args.algorithm == "late_acceptance_hill_climbing":
+            output = localsearchsolverpy.late_acceptance_hill_climbing(
+                    local_scheme,
+                    time_limit=10)
+        elif args.algorithm == "tabu_search":
+            output = localsearchsolverpy.tabu_search(
+                    local_scheme,
+                    time_limit=10)
+        elif args.algorithm == "memetic_algorithm":
+            output = localsearchsolverpy.memetic_algorithm(
+                    local_scheme,
+                    time_limit=10)
         if args.certificate is not None:
             local_scheme.write(output["solution_pool"].best)
             print()
@@ -1,10 +1,18 @@
 import localsearchsolverpy
 
+from array import array
+import collections
+import heapq
 import json
 import math
 import random
+import struct
+import time
 
-random.seed(0)
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class Location:
@@ -17,6 +25,15 @@ class Instance:
 
     def __init__(self, filepath=None):
         self.locations = []
+        # Coordinates and distance matrix, computed by 'init_distances' if
+        # NumPy is available.
+        self.xs = None
+        self.ys = None
+        self.distance_matrix = None
+        self.maximum_matrix_size = None
+        # Candidate lists, computed on demand by 'nearest_neighbors'.
+        self.neighbors = None
+        self.neighbor_distances = None
         if filepath is not None:
             with open(filepath) as json_file:
                 data = json.load(json_file)
@@ -32,13 +49,211 @@ class Instance:
         location.x = x
         location.y = y
         self.locations.append(location)
+        self.xs = None
+        self.ys = None
+        self.distance_matrix = None
+        self.neighbors = None
+        self.neighbor_distances = None
+
+    def __getstate__(self):
+        # The distance matrix is not pickled, for example when the local
+        # scheme is sent to worker processes; it is computed again when the
+        # instance is unpickled.
+        state = self.__dict__.copy()
+        state["distance_matrix"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.xs is not None:
+            self.init_distances(self.maximum_matrix_size)
+
+    def init_distances(self, maximum_matrix_size=1024):
+        """Prepare vectorized distance computations with NumPy.
+
+        Coordinates are stored in arrays. If the instance has at most
+        'maximum_matrix_size' locations, the full distance matrix is also
+        computed.
+
+        Without NumPy, distances are computed from the locations on each
+        call.
+
+        """
+        if np is None:
+            return
+        n = len(self.locations)
+        self.xs = np.array([location.x for location in self.locations],
+                           dtype=np.float64)
+        self.ys = np.array([location.y for location in self.locations],
+                           dtype=np.float64)
+        self.distance_matrix = None
+        self.maximum_matrix_size = maximum_matrix_size
+        if n <= maximum_matrix_size:
+            # The matrix is filled one row at a time, so that no temporary
+            # array of the size of the matrix is created.
+            diagonal = 0
+            if n > 0:
+                diagonal = math.hypot(
+                        self.xs.max() - self.xs.min(),
+                        self.ys.max() - self.ys.min())
+            distance_matrix = np.empty(
+                    (n, n),
+                    dtype=np.int32 if diagonal < 2 ** 31 - 1 else np.int64)
+            for location_id in range(n):
+                distance_matrix[location_id] = np.rint(np.hypot(
+                    self.xs - self.xs[location_id],
+                    self.ys - self.ys[location_id]))
+            self.distance_matrix = distance_matrix
 
     def distance(self, location_id_1, location_id_2):
+        if self.distance_matrix is not None:
+            return self.distance_matrix.item(location_id_1, location_id_2)
         xd = self.locations[location_id_2].x - self.locations[location_id_1].x
         yd = self.locations[location_id_2].y - self.locations[location_id_1].y
         d = round(math.sqrt(xd * xd + yd * yd))
         return d
 
+    def distances(self, location_id, location_ids):
+        """Return the list of the distances between location 'location_id'
+        and each location of 'location_ids'."""
+        if self.distance_matrix is not None:
+            return self.distance_matrix[location_id, location_ids].tolist()
+        if self.xs is not None:
+            location_ids = np.asarray(location_ids, dtype=np.intp)
+            return np.rint(np.hypot(
+                self.xs[location_ids] - self.xs[location_id],
+                self.ys[location_ids] - self.ys[location_id])).astype(
+                        np.int64).tolist()
+        return [self.distance(location_id, location_id_2)
+                for location_id_2 in location_ids]
+
+    def tour_length(self, locations):
+        """Return the length of the cycle visiting 'locations' in order."""
+        if self.xs is not None:
+            locations = np.asarray(locations, dtype=np.intp)
+            locations_next = np.roll(locations, -1)
+            if self.distance_matrix is not None:
+                return int(self.distance_matrix[
+                    locations, locations_next].sum(dtype=np.int64))
+            return int(np.rint(np.hypot(
+                self.xs[locations_next] - self.xs[locations],
+                self.ys[locations_next] - self.ys[locations])).sum())
+        return sum(self.distance(
+                locations[pos - 1],
+                locations[pos])
+            for pos in range(len(locations)))
+
+    def nearest_neighbors(self, number_of_neighbors):
+        """Compute, for each location, its closest locations sorted by
+        increasing distance.
+
+        The locations are bucketed in a grid with about two locations per
+        cell. The neighbors of a location are searched in rings of cells of
+        increasing size around its cell, until no unvisited cell can contain
+        a closer location.
+
+        The lists are computed once and stored in 'self.neighbors' and
+        'self.neighbor_distances'.
+
+        """
+        n = len(self.locations)
+        k = min(number_of_neighbors, n - 1)
+        if self.neighbors is not None and len(self.neighbors[0]) == k:
+            return self.neighbors
+
+        xs = [location.x for location in self.locations]
+        ys = [location.y for location in self.locations]
+        x_min, y_min = min(xs), min(ys)
+        width = max(max(xs) - x_min, 1)
+        height = max(max(ys) - y_min, 1)
+        cell_size = max(math.sqrt(2 * width * height / n), 1)
+        number_of_columns = int(width / cell_size) + 1
+        number_of_rows = int(height / cell_size) + 1
+        cells = collections.defaultdict(list)
+        for location_id in range(n):
+            column = int((xs[location_id] - x_min) / cell_size)
+            row = int((ys[location_id] - y_min) / cell_size)
+            cells[column, row].append(location_id)
+        maximum_ring = max(number_of_columns, number_of_rows)
+
+        def search(location_id):
+            x, y = xs[location_id], ys[location_id]
+            column = int((x - x_min) / cell_size)
+            row = int((y - y_min) / cell_size)
+            candidates = []
+            for ring in range(maximum_ring + 1):
+                ring_location_ids = []
+                for c in range(column - ring, column + ring + 1):
+                    for r in range(row - ring, row + ring + 1):
+                        # Only visit the cells on the border of the ring.
+                        if max(abs(c - column), abs(r - row)) != ring:
+                            continue
+                        ring_location_ids += cells.get((c, r), ())
+                if ring == 0:
+                    ring_location_ids.remove(location_id)
+                if ring_location_ids:
+                    candidates += zip(
+                            self.distances(location_id, ring_location_ids),
+                            ring_location_ids)
+                # Locations in the next rings are at least at distance
+                # 'ring * cell_size'.
+                if len(candidates) >= k:
+                    candidates = heapq.nsmallest(k, candidates)
+                    if candidates[-1][0] <= ring * cell_size:
+                        break
+            candidates = heapq.nsmallest(k, candidates)
+            self.neighbors[location_id] = [
+                    location_id_2 for _, location_id_2 in candidates]
+            self.neighbor_distances[location_id] = [
+                    d for d, _ in candidates]
+
+        self.neighbors = [None] * n
+        self.neighbor_distances = [None] * n
+        if self.xs is None:
+            for location_id in range(n):
+                search(location_id)
+            return self.neighbors
+
+        # With NumPy, the neighbors of all the locations of a cell are
+        # computed at once from the locations of the surrounding cells. The
+        # locations whose neighbors might lie outside of these cells are
+        # searched separately.
+        radius = 2
+        for (column, row), cell_location_ids in cells.items():
+            block_location_ids = []
+            for c in range(column - radius, column + radius + 1):
+                for r in range(row - radius, row + radius + 1):
+                    block_location_ids += cells.get((c, r), ())
+            if len(block_location_ids) <= k:
+                for location_id in cell_location_ids:
+                    search(location_id)
+                continue
+            cell_location_ids = np.array(cell_location_ids, dtype=np.intp)
+            block_location_ids = np.array(block_location_ids, dtype=np.intp)
+            block_distances = np.rint(np.hypot(
+                self.xs[cell_location_ids, None]
+                - self.xs[None, block_location_ids],
+                self.ys[cell_location_ids, None]
+                - self.ys[None, block_location_ids]))
+            block_distances[
+                    cell_location_ids[:, None]
+                    == block_location_ids[None, :]] = np.inf
+            order = np.argpartition(block_distances, k - 1, axis=1)[:, :k]
+            nearest_distances = np.take_along_axis(
+                    block_distances, order, axis=1)
+            order = np.take_along_axis(
+                    order, np.argsort(nearest_distances, axis=1), axis=1)
+            nearest_distances.sort(axis=1)
+            for i, location_id in enumerate(cell_location_ids.tolist()):
+                if nearest_distances[i, -1] <= radius * cell_size:
+                    self.neighbors[location_id] = (
+                            block_location_ids[order[i]].tolist())
+                    self.neighbor_distances[location_id] = (
+                            nearest_distances[i].astype(np.int64).tolist())
+                else:
+                    search(location_id)
+        return self.neighbors
+
     def write(self, filepath):
         data = {"xs": [location.x for location in self.locations],
                 "ys": [location.y for location in self.locations]}
@@ -69,68 +284,259 @@ class Instance:
             return (is_feasible, length)
 
 
+class Tour:
+    """A tour stored as an array of locations, with the position of each
+    location in the tour.
+
+    The tour is a cycle: the location following the last one is the first
+    one.
+
+    """
+
+    def __init__(self, locations):
+        self.locations = array('i', locations)
+        self.positions = array('i', bytes(4 * len(self.locations)))
+        for pos, location_id in enumerate(self.locations):
+            self.positions[location_id] = pos
+
+    def __len__(self):
+        return len(self.locations)
+
+    def copy(self):
+        tour = Tour.__new__(Tour)
+        tour.locations = self.locations[:]
+        tour.positions = self.positions[:]
+        return tour
+
+    def next(self, location_id):
+        pos = self.positions[location_id] + 1
+        return self.locations[pos if pos < len(self.locations) else 0]
+
+    def previous(self, location_id):
+        return self.locations[self.positions[location_id] - 1]
+
+    def reverse(self, pos_1, pos_2):
+        """Reverse the part of the tour going from position 'pos_1' to
+        position 'pos_2'.
+
+        If it is longer than the rest of the tour, the rest of the tour is
+        reversed instead, which leads to the same cycle.
+
+        """
+        locations = self.locations
+        positions = self.positions
+        n = len(locations)
+        length = (pos_2 - pos_1) % n + 1
+        if 2 * length > n:
+            pos_1, pos_2 = (pos_2 + 1) % n, (pos_1 - 1) % n
+            length = n - length
+        if pos_1 <= pos_2:
+            locations[pos_1:pos_2 + 1] = locations[pos_1:pos_2 + 1][::-1]
+            for pos in range(pos_1, pos_2 + 1):
+                positions[locations[pos]] = pos
+            return
+        # The part to reverse contains the end and the beginning of the
+        # array.
+        for _ in range(length // 2):
+            location_id_1 = locations[pos_1]
+            location_id_2 = locations[pos_2]
+            locations[pos_1] = location_id_2
+            positions[location_id_2] = pos_1
+            locations[pos_2] = location_id_1
+            positions[location_id_1] = pos_2
+            pos_1 = pos_1 + 1 if pos_1 < n - 1 else 0
+            pos_2 = pos_2 - 1 if pos_2 > 0 else n - 1
+
+    def move_segment(self, pos_1, pos_2, pos_3, pos_4):
+        """Replace the parts of the tour B = ]pos_1, pos_2], C = ]pos_2,
+        pos_3] and D = ]pos_3, pos_4] by D C B, where
+        pos_1 < pos_2 < pos_3 < pos_4."""
+        locations = self.locations
+        positions = self.positions
+        locations[pos_1 + 1:pos_4 + 1] = (
+                locations[pos_3 + 1:pos_4 + 1]
+                + locations[pos_2 + 1:pos_3 + 1]
+                + locations[pos_1 + 1:pos_2 + 1])
+        for pos in range(pos_1 + 1, pos_4 + 1):
+            positions[locations[pos]] = pos
+
+
 class LocalScheme:
-    """An elementary local scheme for the Travelling Salesman Problem."""
+    """A local scheme for the Travelling Salesman Problem.
+
+    The neighborhood is the 2-opt neighborhood restricted to candidate
+    lists: an edge (a, b) can only be replaced by an edge (a, c) where c is
+    one of the 'number_of_neighbors' closest locations of a.
+
+    Don't-look bits are used: a location is only explored again once one of
+    its adjacent edges has changed.
+
+    If 'first_improvement' is set, the first improving move found from a
+    location is applied; otherwise, the best move from this location is
+    applied.
+
+    The perturbation is a double-bridge move. Its cost is evaluated exactly
+    from the four edges it changes. In the local search following a
+    perturbation, only the endpoints of these edges have their don't-look
+    bit off.
+
+    """
 
     class Solution:
 
         def __init__(self):
-            self.locations = None
+            self.tour = None
             self.length = None
 
     def __init__(self, instance, **kwargs):
         self.instance = instance
+        self.number_of_neighbors = kwargs.get("number_of_neighbors", 10)
+        self.first_improvement = kwargs.get("first_improvement", False)
+        self.instance.init_distances(
+                kwargs.get("maximum_distance_matrix_size", 1024))
 
-    def initial_solution(self, initial_solution_id):
+    def initial_solution(self, initial_solution_id, rng=random):
         n = len(self.instance.locations)
         solution = self.Solution()
-        solution.locations = [i for i in range(n)]
-        random.shuffle(solution.locations)
-        solution.locations.append(solution.locations[0])
-        solution.length = sum(self.instance.distance(
-                solution.locations[pos],
-                solution.locations[pos + 1])
-            for pos in range(n))
+        locations = [i for i in range(n)]
+        rng.shuffle(locations)
+        solution.tour = Tour(locations)
+        solution.length = self.instance.tour_length(solution.tour.locations)
+        return solution
+
+    def copy_solution(self, solution):
+        solution_copy = self.Solution()
+        solution_copy.tour = solution.tour.copy()
+        solution_copy.length = solution.length
+        return solution_copy
+
+    def solution_key(self, solution):
+        """Two tours are identical if they visit the locations in the same
+        order, whatever their starting location and their direction."""
+        locations = solution.tour.locations
+        pos = solution.tour.positions[0]
+        locations = locations[pos:] + locations[:pos]
+        if len(locations) > 2 and locations[1] > locations[-1]:
+            locations = locations[:1] + locations[:0:-1]
+        return locations.tobytes()
+
+    def crossover(self, solution_1, solution_2, rng=random):
+        """Order crossover: a segment of the first parent is kept, the other
+        locations are visited in the order of the second parent."""
+        locations_1 = solution_1.tour.locations
+        n = len(locations_1)
+        pos_1, pos_2 = sorted(rng.sample(range(n + 1), 2))
+        segment = locations_1[pos_1:pos_2]
+        in_segment = bytearray(n)
+        for location_id in segment:
+            in_segment[location_id] = 1
+        locations = array('i', segment)
+        locations.extend(
+                location_id for location_id in solution_2.tour.locations
+                if not in_segment[location_id])
+        solution = self.Solution()
+        solution.tour = Tour(locations)
+        solution.length = self.instance.tour_length(locations)
+        return solution
+
+    def solution_distance(self, solution_1, solution_2):
+        """Number of edges of the first tour which are not in the second
+        one."""
+        tour_2 = solution_2.tour
+        locations_1 = solution_1.tour.locations
+        distance = 0
+        for pos in range(len(locations_1)):
+            location_id_1 = locations_1[pos - 1]
+            location_id_2 = locations_1[pos]
+            if tour_2.next(location_id_1) != location_id_2 \
+                    and tour_2.previous(location_id_1) != location_id_2:
+                distance += 1
+        return distance
+
+    def serialize(self, solution):
+        """Pack the length and the locations of the tour into bytes."""
+        return (
+                struct.pack("<q", solution.length)
+                + solution.tour.locations.tobytes())
+
+    def deserialize(self, data):
+        solution = self.Solution()
+        solution.length, = struct.unpack_from("<q", data)
+        locations = array('i')
+        locations.frombytes(data[8:])
+        solution.tour = Tour(locations)
         return solution
 
     def global_cost(self, solution):
         return (solution.length)
 
-    def local_search(self, solution, perturbation=None):
+    def local_search(self, solution, perturbation=None, deadline=None):
         n = len(self.instance.locations)
-        while True:
-            # print(solution.locations)
-            # print(solution.length)
-            pos_1_best = None
-            pos_2_best = None
-            l_best = solution.length
-            for pos_1 in range(n):
-                i1 = solution.locations[pos_1]
-                j1 = solution.locations[pos_1 + 1]
-                for pos_2 in range(pos_1 + 2, n):
-                    i2 = solution.locations[pos_2]
-                    j2 = solution.locations[pos_2 + 1]
-                    l_new = (solution.length
-                             - self.instance.distance(i1, j1)
-                             - self.instance.distance(i2, j2)
-                             + self.instance.distance(i1, i2)
-                             + self.instance.distance(j1, j2))
-                    if l_new < l_best:
-                        l_best = l_new
-                        pos_1_best = pos_1
-                        pos_2_best = pos_2
-            if pos_1_best is not None:
-                locations = []
-                for p in range(pos_1_best + 1):
-                    locations.append(solution.locations[p])
-                for p in range(pos_2_best, pos_1_best, -1):
-                    locations.append(solution.locations[p])
-                for p in range(pos_2_best + 1, n + 1):
-                    locations.append(solution.locations[p])
-                solution.locations = locations
-                solution.length = l_best
+        if n < 4:
+            return
+        distance = self.instance.distance
+        self.instance.nearest_neighbors(self.number_of_neighbors)
+        neighbors = self.instance.neighbors
+        neighbor_distances = self.instance.neighbor_distances
+
+        tour = solution.tour.locations
+        positions = solution.tour.positions
+
+        # Locations whose don't-look bit is off.
+        if perturbation is not None:
+            queue = collections.deque(perturbation.location_ids)
+            in_queue = [False] * n
+            for location_id in queue:
+                in_queue[location_id] = True
+        else:
+            queue = collections.deque(tour)
+            in_queue = [True] * n
+        number_of_pops = 0
+        while queue:
+            # Stop once the deadline of the algorithm is reached. The clock is
+            # only read every 256 locations.
+            number_of_pops += 1
+            if deadline is not None and number_of_pops % 256 == 0 \
+                    and time.time() > deadline:
+                break
+            a = queue.popleft()
+            in_queue[a] = False
+            gain_best = 0
+            move_best = None
+            # Try to replace edges (a, b) and (c, d) by edges (a, c) and
+            # (b, d), with b and d following (direction 1) or preceding
+            # (direction -1) a and c.
+            for direction in (1, -1):
+                b = tour[(positions[a] + direction) % n]
+                d_ab = distance(a, b)
+                for c, d_ac in zip(neighbors[a], neighbor_distances[a]):
+                    g1 = d_ab - d_ac
+                    # Neighbors are sorted by increasing distance.
+                    if g1 <= 0:
+                        break
+                    d = tour[(positions[c] + direction) % n]
+                    if d == a:
+                        continue
+                    gain = g1 + distance(c, d) - distance(b, d)
+                    if gain > gain_best:
+                        gain_best = gain
+                        move_best = (direction, b, c, d)
+                        if self.first_improvement:
+                            break
+                if move_best is not None and self.first_improvement:
+                    break
+            if move_best is None:
                 continue
-            break
+            direction, b, c, d = move_best
+            if direction == 1:
+                solution.tour.reverse(positions[b], positions[c])
+            else:
+                solution.tour.reverse(positions[c], positions[b])
+            solution.length -= gain_best
+            for location_id in (a, b, c, d):
+                if not in_queue[location_id]:
+                    in_queue[location_id] = True
+                    queue.append(location_id)
 
     class Move:
 
@@ -139,43 +545,108 @@ class LocalScheme:
             self.pos_2 = None
             self.pos_3 = None
             self.pos_4 = None
+            # Endpoints of the edges removed by the move.
+            self.location_ids = None
+            self.length_difference = None
 
-    def perturbations(self, solution):
+    def perturbations(self, solution, rng=random):
         n = len(self.instance.locations)
+        distance = self.instance.distance
+        tour = solution.tour.locations
         moves = []
         for _ in range(32):
-            edges = random.sample(range(0, n), 4)
+            edges = rng.sample(range(0, n), 4)
             edges.sort()
             move = self.Move()
             move.pos_1 = edges[0]
             move.pos_2 = edges[1]
             move.pos_3 = edges[2]
             move.pos_4 = edges[3]
-            move.global_cost = self.global_cost(solution)
+            # Edges (a1, b1), (a2, b2), (a3, b3) and (a4, b4) are replaced by
+            # edges (a1, b3), (a4, b2), (a3, b1) and (a2, b4).
+            a1, b1 = tour[move.pos_1], tour[move.pos_1 + 1]
+            a2, b2 = tour[move.pos_2], tour[move.pos_2 + 1]
+            a3, b3 = tour[move.pos_3], tour[move.pos_3 + 1]
+            a4, b4 = tour[move.pos_4], tour[(move.pos_4 + 1) % n]
+            move.location_ids = (a1, b1, a2, b2, a3, b3, a4, b4)
+            move.length_difference = (
+                    distance(a1, b3) + distance(a4, b2)
+                    + distance(a3, b1) + distance(a2, b4)
+                    - distance(a1, b1) - distance(a2, b2)
+                    - distance(a3, b3) - distance(a4, b4))
+            move.global_cost = solution.length + move.length_difference
             moves.append(move)
         return moves
 
+    class TwoOptMove:
+
+        def __init__(self):
+            # Edges (a, b) and (c, d) are replaced by edges (a, c) and (b, d).
+            self.location_ids = None
+            self.length_difference = None
+
+    def random_move(self, solution, rng=random):
+        """Return a random 2-opt move between a location and one of its
+        nearest neighbors."""
+        distance = self.instance.distance
+        self.instance.nearest_neighbors(self.number_of_neighbors)
+        tour = solution.tour
+        a = rng.randrange(len(tour))
+        c = rng.choice(self.instance.neighbors[a])
+        b = tour.next(a)
+        d = tour.next(c)
+        move = self.TwoOptMove()
+        move.location_ids = (a, b, c, d)
+        move.length_difference = (
+                distance(a, c) + distance(b, d)
+                - distance(a, b) - distance(c, d))
+        return move
+
+    def neighbors(self, solution):
+        """Generate the 2-opt moves between each location and its nearest
+        neighbors."""
+        distance = self.instance.distance
+        self.instance.nearest_neighbors(self.number_of_neighbors)
+        tour = solution.tour
+        for a in tour.locations:
+            b = tour.next(a)
+            d_ab = distance(a, b)
+            for c in self.instance.neighbors[a]:
+                d = tour.next(c)
+                if c == b or d == a:
+                    continue
+                move = self.TwoOptMove()
+                move.location_ids = (a, b, c, d)
+                move.length_difference = (
+                        distance(a, c) + distance(b, d)
+                        - d_ab - distance(c, d))
+                yield move
+
+    def cost_delta(self, solution, move):
+        return move.length_difference
+
+    def move_attributes(self, solution, move):
+        # Once a 2-opt move has been applied between locations 'a' and 'c',
+        # moves involving them are tabu. A 2-opt move can't undo a
+        # double-bridge perturbation, which has no attribute.
+        if not isinstance(move, self.TwoOptMove):
+            return ()
+        a, _, c, _ = move.location_ids
+        return (a, c)
+
     def apply_move(self, solution, move):
-        n = len(self.instance.locations)
-        locations = []
-        for p in range(move.pos_1 + 1):
-            locations.append(solution.locations[p])
-        for p in range(move.pos_3 + 1, move.pos_4 + 1):
-            locations.append(solution.locations[p])
-        for p in range(move.pos_2 + 1, move.pos_3 + 1):
-            locations.append(solution.locations[p])
-        for p in range(move.pos_1 + 1, move.pos_2 + 1):
-            locations.append(solution.locations[p])
-        for p in range(move.pos_4 + 1, n + 1):
-            locations.append(solution.locations[p])
-        solution.locations = locations
-        solution.length = sum(self.instance.distance(
-                solution.locations[pos],
-                solution.locations[pos + 1])
-            for pos in range(n))
+        if isinstance(move, self.TwoOptMove):
+            _, b, c, _ = move.location_ids
+            positions = solution.tour.positions
+            solution.tour.reverse(positions[b], positions[c])
+        else:
+            solution.tour.move_segment(
+                    move.pos_1, move.pos_2, move.pos_3, move.pos_4)
+        solution.length += move.length_difference
 
     def write(self, solution):
-        data = {"locations": solution.locations}
+        locations = solution.tour.locations.tolist()
+        data = {"locations": locations + locations[:1]}
         with open(args.certificate, 'w') as json_file:
             json.dump(data, json_file)
 
@@ -227,6 +698,18 @@ if __name__ == "__main__":
             output = localsearchsolverpy.iterated_local_search(
                     local_scheme,
                     time_limit=10)
+        elif args.algorithm == "late_acceptance_hill_climbing":
+            output = localsearchsolverpy.late_acceptance_hill_climbing(
+                    local_scheme,
+                    time_limit=10)
+        elif args.algorithm == "tabu_search":
+            output = localsearchsolverpy.tabu_search(
+                    local_scheme,
+                    time_limit=10)
+        elif args.algorithm == "memetic_algorithm":
+            output = localsearchsolverpy.memetic_algorithm(
+                    local_scheme,
+                    time_limit=10)
         if args.certificate is not None:
             local_scheme.write(output["solution_pool"].best)
             print()
@@ -1,7 +1,17 @@
 from .restarting_local_search import restarting_local_search
 from .iterated_local_search import iterated_local_search
+from .late_acceptance_hill_climbing import late_acceptance_hill_climbing
+from .tabu_search import tabu_search
+from .memetic_algorithm import memetic_algorithm
+from .solver import Solver
+from .batch import solve_batch
 
 __all__ = [
     'restarting_local_search',
     'iterated_local_search',
+    'late_acceptance_hill_climbing',
+    'tabu_search',
+    'memetic_algorithm',
+    'Solver',
+    'solve_batch',
 ]
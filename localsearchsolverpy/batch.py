@@ -0,0 +1,82 @@
+import concurrent.futures
+import itertools
+import os
+
+
+def _run_algorithm(algorithm, local_scheme, parameters):
+    return algorithm(local_scheme, **parameters)
+
+
+def solve_batch(algorithm, problems, **parameters):
+    """Solve many instances with a single pool of worker processes.
+
+    'problems' is an iterable of pairs '(local_scheme, parameters)'. Each
+    instance is solved by 'algorithm(local_scheme, **parameters)' in a
+    worker process, the parameters of the instance overriding the ones given
+    to 'solve_batch'. The time limit of an instance starts when a worker
+    starts solving it.
+
+    Pairs '(problem_id, output)' are yielded as soon as the instances are
+    solved, 'problem_id' being the position of the instance in 'problems'
+    and 'output' the dictionary returned by the algorithm.
+
+    Parameters:
+    - 'number_of_workers': number of worker processes, the number of CPUs
+      by default;
+    - 'executor': an existing 'concurrent.futures.Executor' to use instead
+      of creating a new pool, for example to keep the same worker processes
+      from one batch to the next;
+    - other parameters are passed to the algorithm. 'verbose' defaults to
+      False.
+
+    """
+    number_of_workers = parameters.pop(
+            "number_of_workers", os.cpu_count() or 1)
+    executor = parameters.pop(
+            "executor", None)
+    parameters.setdefault("verbose", False)
+
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_of_workers) as executor:
+            yield from _solve_batch(
+                    executor, number_of_workers,
+                    algorithm, problems, parameters)
+    else:
+        yield from _solve_batch(
+                executor, number_of_workers,
+                algorithm, problems, parameters)
+
+
+def _solve_batch(executor, number_of_workers, algorithm, problems, parameters):
+    # Instances are submitted lazily, so that 'problems' can be a generator
+    # of many instances; a few are kept waiting so that workers don't become
+    # idle between two instances.
+    problems = enumerate(problems)
+    futures = {}
+    try:
+        while True:
+            for problem_id, (local_scheme, problem_parameters) in (
+                    itertools.islice(
+                        problems, 2 * number_of_workers - len(futures))):
+                future = executor.submit(
+                        _run_algorithm,
+                        algorithm,
+                        local_scheme,
+                        {**parameters, **problem_parameters})
+                futures[future] = problem_id
+
+            if not futures:
+                break
+
+            done, _ = concurrent.futures.wait(
+                    futures,
+                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                problem_id = futures.pop(future)
+                yield problem_id, future.result()
+    finally:
+        # If the caller stops reading the results, the instances which have
+        # not been started yet are dropped.
+        for future in futures:
+            future.cancel()
@@ -1,58 +1,700 @@
+from array import array
+import bisect
+import collections
+import copy
+import functools
+import inspect
+import json
+import os
+import pickle
+import random
+import struct
 import time
 
 
+# Local scheme of the current worker process. It is set once by
+# '_init_worker' so that it is not sent again with each task.
+_worker_local_scheme = None
+
+
+def _init_worker(local_scheme):
+    global _worker_local_scheme
+    _worker_local_scheme = local_scheme
+
+
+def _run_restart(
+        restart_seed, initial_solution_id, initial_solution, deadline):
+    # Build an initial solution, or read the one given, and improve it with
+    # the local scheme of the worker process. Used by the algorithms which
+    # run restarts in worker processes.
+    profiler = Profiler()
+    rng = random.Random(restart_seed)
+    local_scheme = LocalSchemeWrapper(
+            _worker_local_scheme, profiler, rng, deadline)
+    # Local schemes which don't take a random number generator use the
+    # 'random' module.
+    random.seed(restart_seed)
+    if initial_solution is None:
+        solution = local_scheme.initial_solution(initial_solution_id)
+    else:
+        solution = deserialize_solution(local_scheme, initial_solution)
+    local_scheme.local_search(solution)
+    return (
+            serialize_solution(local_scheme, solution),
+            dict(profiler.number_of_calls),
+            dict(profiler.times))
+
+
+def copy_solution(local_scheme, solution):
+    # Use the copy method of the local scheme if it provides one. It is
+    # usually much cheaper than a generic deep copy.
+    if hasattr(local_scheme, "copy_solution"):
+        return local_scheme.copy_solution(solution)
+    return copy.deepcopy(solution)
+
+
+def serialize_solution(local_scheme, solution):
+    # Use the serialize method of the local scheme if it provides one, to
+    # send solutions to other processes and to write them in checkpoints.
+    # Otherwise, the solution itself is pickled.
+    if hasattr(local_scheme, "serialize"):
+        return local_scheme.serialize(solution)
+    return solution
+
+
+def deserialize_solution(local_scheme, data):
+    if hasattr(local_scheme, "deserialize"):
+        return local_scheme.deserialize(data)
+    return data
+
+
+def add_cost(cost, delta):
+    # Costs may be tuples compared lexicographically; their differences are
+    # then tuples too, added componentwise.
+    if type(cost) == tuple:
+        return tuple(x + y for x, y in zip(cost, delta))
+    return cost + delta
+
+
+def is_improving(delta):
+    # A cost difference improves the cost if it is negative; for tuple
+    # costs, if its first non-zero element is negative.
+    if type(delta) == tuple:
+        return delta < (0,) * len(delta)
+    return delta < 0
+
+
+def descent(local_scheme, solution, perturbation=None, deadline=None):
+    """Generic local search for local schemes which provide a neighborhood
+    instead of a 'local_search' method.
+
+    The local scheme provides:
+    - 'neighbors(solution)', an iterable of the moves of the neighborhood of
+      the solution;
+    - 'cost_delta(solution, move)', the cost of the solution after the move
+      minus its current cost. For tuple costs, it is the tuple of the
+      differences. Alternatively, 'cost_deltas(solution, moves)' returns the
+      differences of a list of moves at once, for example in vectorized
+      form;
+    - 'apply_move(solution, move)'.
+
+    The best improving move is applied until there is none, or, if the local
+    scheme has a true 'first_improvement' attribute, the first one found.
+
+    If a perturbation is given, the moves sharing an attribute with it are
+    not applied, so that the descent doesn't just undo it. Attributes are
+    given by the optional 'move_attributes(solution, move)' method of the
+    local scheme, as for 'tabu_search' (by default, the move itself).
+
+    """
+    first_improvement = getattr(local_scheme, "first_improvement", False)
+    cost_deltas = getattr(local_scheme, "cost_deltas", None)
+    cost_delta = getattr(local_scheme, "cost_delta", None)
+    move_attributes = getattr(
+            local_scheme, "move_attributes",
+            lambda solution, move: (move,))
+    forbidden_attributes = set()
+    if perturbation is not None:
+        forbidden_attributes.update(move_attributes(solution, perturbation))
+
+    def neighbors():
+        if not forbidden_attributes:
+            return local_scheme.neighbors(solution)
+        return (
+                move for move in local_scheme.neighbors(solution)
+                if forbidden_attributes.isdisjoint(
+                    move_attributes(solution, move)))
+
+    while True:
+        # Stop once the deadline of the algorithm is reached.
+        if deadline is not None and time.time() > deadline:
+            break
+        if cost_deltas is not None:
+            moves = list(neighbors())
+            moves_deltas = zip(moves, cost_deltas(solution, moves))
+        else:
+            # Cost differences are computed lazily, so that the search of
+            # the first improving move stops as soon as it is found.
+            moves_deltas = (
+                    (move, cost_delta(solution, move))
+                    for move in neighbors())
+        move_best = None
+        delta_best = None
+        for move, delta in moves_deltas:
+            if not is_improving(delta):
+                continue
+            if delta_best is None or delta < delta_best:
+                move_best = move
+                delta_best = delta
+                if first_improvement:
+                    break
+        if move_best is None:
+            break
+        local_scheme.apply_move(solution, move_best)
+
+
+def save_checkpoint(filepath, checkpoint):
+    # Write to a temporary file first, so that an interruption while writing
+    # doesn't corrupt the previous checkpoint.
+    filepath_tmp = filepath + ".tmp"
+    with open(filepath_tmp, 'wb') as checkpoint_file:
+        pickle.dump(checkpoint, checkpoint_file, pickle.HIGHEST_PROTOCOL)
+    os.replace(filepath_tmp, filepath)
+
+
+def load_checkpoint(filepath):
+    with open(filepath, 'rb') as checkpoint_file:
+        return pickle.load(checkpoint_file)
+
+
+class Termination:
+    """Stopping criteria shared by the algorithms.
+
+    The criteria are read from the parameters of the algorithm:
+    - 'time_limit': maximum time, in seconds;
+    - 'maximum_number_of_iterations_without_improvement': maximum number of
+      iterations since the last new best solution;
+    - 'maximum_time_without_improvement': maximum time, in seconds, since
+      the last new best solution;
+    - 'target_cost': the search stops once the best solution has a cost
+      lower than or equal to it;
+    - 'bound' and 'maximum_gap': the search stops once the relative gap
+      between the cost of the best solution and the bound is lower than or
+      equal to 'maximum_gap'. For tuple costs, the gap is computed on the
+      last element, if the others are equal;
+    - 'cancellation_token': an object with an 'is_set' method, typically a
+      'threading.Event'; the search stops once it is set.
+
+    """
+
+    def __init__(self, start, parameters):
+        self.start = start
+        self.time_limit = parameters.get(
+                "time_limit", float('inf'))
+        self.maximum_number_of_iterations_without_improvement = (
+                parameters.get(
+                    "maximum_number_of_iterations_without_improvement",
+                    float('inf')))
+        self.maximum_time_without_improvement = parameters.get(
+                "maximum_time_without_improvement", float('inf'))
+        self.target_cost = parameters.get(
+                "target_cost", None)
+        self.bound = parameters.get(
+                "bound", None)
+        self.maximum_gap = parameters.get(
+                "maximum_gap", 0)
+        self.cancellation_token = parameters.get(
+                "cancellation_token", None)
+        self.deadline = start + self.time_limit
+        self.last_improvement_time = start
+        self.last_improvement_iteration = 0
+        self.reason = None
+
+    def display(self, verbose, width):
+        if verbose:
+            for label, value in (
+                    ("Stall iterations:",
+                     self.maximum_number_of_iterations_without_improvement),
+                    ("Stall time:", self.maximum_time_without_improvement),
+                    ("Target cost:", self.target_cost),
+                    ("Bound:", self.bound),
+                    ("Maximum gap:", self.maximum_gap)):
+                print('{:<{}}'.format(label, width) + f"{value}")
+
+    def new_best(self, iteration):
+        self.last_improvement_time = time.time()
+        self.last_improvement_iteration = iteration
+
+    def gap(self, cost):
+        bound = self.bound
+        if type(cost) == tuple:
+            if cost[:-1] != bound[:-1]:
+                return float('inf')
+            cost, bound = cost[-1], bound[-1]
+        if cost == bound:
+            return 0
+        if cost == 0:
+            return float('inf')
+        return abs(cost - bound) / abs(cost)
+
+    def stop(self, iteration, best_cost):
+        """Return the reason to stop the search, or None if it should go on.
+        """
+        current_time = time.time()
+        if self.cancellation_token is not None \
+                and self.cancellation_token.is_set():
+            self.reason = "cancelled"
+        elif current_time > self.deadline:
+            self.reason = "time limit"
+        elif (
+                iteration - self.last_improvement_iteration
+                > self.maximum_number_of_iterations_without_improvement):
+            self.reason = "iterations without improvement"
+        elif (
+                current_time - self.last_improvement_time
+                > self.maximum_time_without_improvement):
+            self.reason = "time without improvement"
+        elif best_cost is not None and self.target_cost is not None \
+                and best_cost <= self.target_cost:
+            self.reason = "target cost"
+        elif best_cost is not None and self.bound is not None \
+                and self.gap(best_cost) <= self.maximum_gap:
+            self.reason = "gap"
+        return self.reason
+
+
+class Profiler:
+    """Number of calls and time spent in each phase of an algorithm.
+
+    If a metrics sink is given, it is called as 'metrics_sink(phase,
+    elapsed_time)' after each measured call.
+
+    """
+
+    def __init__(self, metrics_sink=None):
+        self.metrics_sink = metrics_sink
+        self.number_of_calls = collections.defaultdict(int)
+        self.times = collections.defaultdict(float)
+
+    def add(self, phase, elapsed_time):
+        self.number_of_calls[phase] += 1
+        self.times[phase] += elapsed_time
+        if self.metrics_sink is not None:
+            self.metrics_sink(phase, elapsed_time)
+
+    def merge(self, number_of_calls, times):
+        """Add the statistics measured by another profiler, for example in a
+        worker process."""
+        for phase, n in number_of_calls.items():
+            self.number_of_calls[phase] += n
+        for phase, t in times.items():
+            self.times[phase] += t
+
+    def output(self):
+        return {
+                phase: {
+                    "number_of_calls": self.number_of_calls[phase],
+                    "time": self.times[phase]}
+                for phase in self.number_of_calls}
+
+    def display(self, verbose):
+        if verbose:
+            print()
+            print(
+                    '{:<24}'.format("Phase")
+                    + '{:>16}'.format("Calls")
+                    + '{:>16}'.format("Time"))
+            print(
+                    '{:<24}'.format("-----")
+                    + '{:>16}'.format("-----")
+                    + '{:>16}'.format("----"))
+            for phase in sorted(
+                    self.times,
+                    key=lambda phase: self.times[phase],
+                    reverse=True):
+                print(
+                        '{:<24}'.format(phase)
+                        + '{:>16}'.format(self.number_of_calls[phase])
+                        + '{:>16.3f}'.format(self.times[phase]))
+
+
+def accepts_argument(function, name):
+    try:
+        return name in inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+class LocalSchemeWrapper:
+    """Local scheme wrapper used by the algorithms.
+
+    It measures the time spent in the methods of the local scheme. If a
+    random number generator is given, it is passed as 'rng' argument to the
+    methods 'initial_solution', 'initial_solutions_batch', 'local_search',
+    'perturbations', 'random_move' and 'crossover' which accept it. If a
+    deadline (a time as returned by 'time.time()') is given, it is passed as
+    'deadline' argument to 'local_search' and 'local_search_batch' if they
+    accept it.
+
+    If the local scheme has no 'local_search' method but provides a
+    neighborhood, 'descent' is used instead.
+
+    The other attributes are read from the wrapped local scheme.
+
+    """
+
+    def __init__(self, local_scheme, profiler, rng=None, deadline=None):
+        self.local_scheme = local_scheme
+        self.profiler = profiler
+        if hasattr(local_scheme, "local_search") \
+                or not hasattr(local_scheme, "neighbors"):
+            self._local_search = getattr(local_scheme, "local_search", None)
+        else:
+            self._local_search = functools.partial(descent, local_scheme)
+        # Extra keyword arguments passed to the methods of the local scheme
+        # which accept them.
+        self.arguments = {}
+        for name, argument, value in (
+                ("initial_solution", "rng", rng),
+                ("initial_solutions_batch", "rng", rng),
+                ("local_search", "rng", rng),
+                ("perturbations", "rng", rng),
+                ("random_move", "rng", rng),
+                ("crossover", "rng", rng),
+                ("local_search", "deadline", deadline),
+                ("local_search_batch", "deadline", deadline)):
+            if value is None:
+                continue
+            if name == "local_search":
+                method = self._local_search
+            else:
+                method = getattr(local_scheme, name, None)
+            if method is not None and accepts_argument(method, argument):
+                self.arguments.setdefault(name, {})[argument] = value
+
+    def __getattr__(self, name):
+        # '__getattr__' is only called for attributes not found on the
+        # wrapper. 'local_scheme' is excluded to avoid an infinite recursion
+        # on a wrapper which is not initialized yet, for example while it is
+        # unpickled.
+        if name in ("local_scheme", "_local_search"):
+            raise AttributeError(name)
+        return getattr(self.local_scheme, name)
+
+    def _call(self, phase, function, *args, **kwargs):
+        arguments = self.arguments.get(phase)
+        if arguments is not None:
+            kwargs.update(arguments)
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.profiler.add(phase, time.perf_counter() - start)
+        return result
+
+    def initial_solution(self, *args, **kwargs):
+        return self._call(
+                "initial_solution", self.local_scheme.initial_solution,
+                *args, **kwargs)
+
+    def local_search(self, *args, **kwargs):
+        return self._call(
+                "local_search", self._local_search,
+                *args, **kwargs)
+
+    def initial_solutions_batch(self, *args, **kwargs):
+        return self._call(
+                "initial_solutions_batch",
+                self.local_scheme.initial_solutions_batch,
+                *args, **kwargs)
+
+    def local_search_batch(self, *args, **kwargs):
+        return self._call(
+                "local_search_batch", self.local_scheme.local_search_batch,
+                *args, **kwargs)
+
+    def solutions_from_batch(self, *args, **kwargs):
+        return self._call(
+                "solutions_from_batch",
+                self.local_scheme.solutions_from_batch,
+                *args, **kwargs)
+
+    def perturbations(self, *args, **kwargs):
+        return self._call(
+                "perturbations", self.local_scheme.perturbations,
+                *args, **kwargs)
+
+    def apply_move(self, *args, **kwargs):
+        return self._call(
+                "apply_move", self.local_scheme.apply_move,
+                *args, **kwargs)
+
+    def crossover(self, *args, **kwargs):
+        return self._call(
+                "crossover", self.local_scheme.crossover,
+                *args, **kwargs)
+
+    def global_cost(self, *args, **kwargs):
+        return self._call(
+                "global_cost", self.local_scheme.global_cost,
+                *args, **kwargs)
+
+    def copy_solution(self, solution):
+        return self._call(
+                "copy_solution", copy_solution, self.local_scheme, solution)
+
+
+class Trace:
+    """Record of the progress of a search.
+
+    An entry (time, iteration, restart, cost) is recorded for each new best
+    solution and, if 'period' is set, every 'period' seconds. Times,
+    iterations and restarts are stored in preallocated arrays whose capacity
+    doubles when they are full.
+
+    If 'filepath' is set, each entry is also written to this file as soon as
+    it is recorded, in JSON Lines format if the file name ends with
+    '.jsonl', and in CSV format otherwise.
+
+    """
+
+    def __init__(self, start, period=None, filepath=None, capacity=1024):
+        self.start = start
+        self.period = period
+        self.next_sample_time = (
+                start + period if period is not None else float('inf'))
+        self.size = 0
+        self.times = array('d', bytes(8 * capacity))
+        self.iterations = array('q', bytes(8 * capacity))
+        self.restarts = array('q', bytes(8 * capacity))
+        self.new_bests = array('b', bytes(capacity))
+        self.costs = [None] * capacity
+        self.file = None
+        self.jsonl = False
+        if filepath is not None:
+            self.file = open(filepath, 'w')
+            self.jsonl = filepath.endswith(".jsonl")
+            if not self.jsonl:
+                self.file.write("time,iteration,restart,new_best,cost\n")
+
+    def _grow(self):
+        capacity = len(self.times)
+        self.times.extend(array('d', bytes(8 * capacity)))
+        self.iterations.extend(array('q', bytes(8 * capacity)))
+        self.restarts.extend(array('q', bytes(8 * capacity)))
+        self.new_bests.extend(array('b', bytes(capacity)))
+        self.costs.extend([None] * capacity)
+
+    def add(self, iteration, restart, cost, new_best=True, current_time=None):
+        if current_time is None:
+            current_time = time.time()
+        if self.size == len(self.times):
+            self._grow()
+        elapsed_time = current_time - self.start
+        self.times[self.size] = elapsed_time
+        self.iterations[self.size] = iteration
+        self.restarts[self.size] = restart
+        self.new_bests[self.size] = new_best
+        self.costs[self.size] = cost
+        self.size += 1
+        if self.file is not None:
+            if self.jsonl:
+                self.file.write(json.dumps({
+                    "time": elapsed_time,
+                    "iteration": iteration,
+                    "restart": restart,
+                    "new_best": bool(new_best),
+                    "cost": cost}) + "\n")
+            else:
+                if type(cost) == tuple:
+                    cost = ' '.join(str(x) for x in cost)
+                self.file.write(
+                        f"{elapsed_time},{iteration},{restart},"
+                        f"{int(new_best)},{cost}\n")
+            self.file.flush()
+
+    def sample(self, iteration, restart, cost):
+        """Record a periodic entry if the period has elapsed."""
+        current_time = time.time()
+        if current_time >= self.next_sample_time:
+            self.add(iteration, restart, cost, False, current_time)
+            while self.next_sample_time <= current_time:
+                self.next_sample_time += self.period
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def output(self):
+        return {
+                "time": self.times[:self.size],
+                "iteration": self.iterations[:self.size],
+                "restart": self.restarts[:self.size],
+                "new_best": self.new_bests[:self.size],
+                "cost": self.costs[:self.size]}
+
+
+_POOL_MAGIC = b"LSSP"
+_POOL_HEADER = "<4sQQ"
+
+
 class SolutionPool:
 
-    def __init__(self, local_scheme, maximum_size=1):
+    def __init__(self, local_scheme, maximum_size=1, profiler=None):
         self.local_scheme = local_scheme
         self.maximum_size = maximum_size
+        self.profiler = profiler
         self.best = None
+        self.best_cost = None
         self.worst = None
+        self.worst_cost = None
+        # Pair (best, best_cost), assigned in a single step so that it can
+        # be read consistently from another thread while the search runs.
+        self.best_snapshot = (None, None)
+        # Solutions of the pool, sorted from the best to the worst, and their
+        # costs.
         self.solutions = []
+        self.costs = []
+        # Keys of the solutions of the pool, used to detect duplicates.
+        self.keys = set()
+
+    def _key(self, solution):
+        # If the local scheme provides a key, two solutions are considered
+        # identical if they have the same key. Otherwise, solutions are
+        # compared with '=='; if the solution class doesn't override it,
+        # this is an identity check.
+        if hasattr(self.local_scheme, "solution_key"):
+            return self.local_scheme.solution_key(solution)
+        if type(solution).__eq__ is object.__eq__:
+            return id(solution)
+        return None
 
-    def add(self, node):
+    def add(self, node, cost=None):
+        if self.profiler is None:
+            return self._add(node, cost)
+        start = time.perf_counter()
+        status = self._add(node, cost)
+        self.profiler.add("solution_pool", time.perf_counter() - start)
+        return status
+
+    def _add(self, node, cost=None):
+        if cost is None:
+            cost = self.local_scheme.global_cost(node)
         # If the new solution is worse than the worst solution of the pool,
         # don't add it and stop.
         if len(self.solutions) >= self.maximum_size:
-            if self.local_scheme.global_cost(node) \
-                    >= self.local_scheme.global_cost(self.worst):
+            if cost >= self.worst_cost:
                 return 0
         # If the new solution is already in the pool, don't add it and stop.
-        for solution in self.solutions:
-            if node == solution:
+        key = self._key(node)
+        if key is not None:
+            if key in self.keys:
                 return 0
+        else:
+            for solution in self.solutions:
+                if node == solution:
+                    return 0
         # Add the new solution to solutions.
-        self.solutions.append(node)
-        # Update best solution.
-        new_best = False
-        if self.best is None \
-                or self.local_scheme.global_cost(node) \
-                < self.local_scheme.global_cost(self.best):
-            new_best = True
-            self.best = node
+        pos = bisect.bisect_right(self.costs, cost)
+        self.solutions.insert(pos, node)
+        self.costs.insert(pos, cost)
+        if key is not None:
+            self.keys.add(key)
         # Check the size of the solution pool.
         if len(self.solutions) > self.maximum_size:
             # Remove worst solution.
-            i = 0
-            while i < len(self.solutions):
-                if self.solutions[i] == self.worst:
-                    self.solutions[i] = self.solutions[-1]
-                    self.solutions.pop()
-                    break
-                else:
-                    i += 1
-        # Compute new worst solutions.
-        self.worst = self.solutions[0]
-        for solution in self.solutions:
-            if self.local_scheme.global_cost(solution) \
-                    > self.local_scheme.global_cost(self.worst):
-                self.worst = solution
+            worst = self.solutions.pop()
+            self.costs.pop()
+            if key is not None:
+                self.keys.discard(self._key(worst))
+        # Update best and worst solutions.
+        new_best = (pos == 0)
+        self.best = self.solutions[0]
+        self.best_cost = self.costs[0]
+        self.worst = self.solutions[-1]
+        self.worst_cost = self.costs[-1]
+        self.best_snapshot = (self.best, self.best_cost)
 
         if new_best:
             return 2
         else:
             return 1
 
+    def remove(self, position):
+        """Remove the solution at 'position', 0 being the best one, and
+        return it with its cost."""
+        solution = self.solutions.pop(position)
+        cost = self.costs.pop(position)
+        key = self._key(solution)
+        if key is not None:
+            self.keys.discard(key)
+        if self.solutions:
+            self.best = self.solutions[0]
+            self.best_cost = self.costs[0]
+            self.worst = self.solutions[-1]
+            self.worst_cost = self.costs[-1]
+        else:
+            self.best = None
+            self.best_cost = None
+            self.worst = None
+            self.worst_cost = None
+        self.best_snapshot = (self.best, self.best_cost)
+        return solution, cost
+
+    def dump(self):
+        """Return the solutions of the pool and their costs as bytes.
+
+        The format is: a header (magic number, number of solutions, size of
+        the costs), the pickled list of costs, the sizes of the serialized
+        solutions, and the serialized solutions. Solutions are serialized
+        with the 'serialize' method of the local scheme if it has one, and
+        pickled otherwise.
+
+        """
+        if hasattr(self.local_scheme, "serialize"):
+            datas = [
+                    self.local_scheme.serialize(solution)
+                    for solution in self.solutions]
+        else:
+            datas = [
+                    pickle.dumps(solution, pickle.HIGHEST_PROTOCOL)
+                    for solution in self.solutions]
+        costs = pickle.dumps(self.costs, pickle.HIGHEST_PROTOCOL)
+        sizes = array('Q', [len(data) for data in datas])
+        return b''.join([
+            struct.pack(_POOL_HEADER, _POOL_MAGIC, len(datas), len(costs)),
+            costs,
+            sizes.tobytes(),
+            *datas])
+
+    def load(self, buffer):
+        """Add the solutions dumped with 'dump' to the pool.
+
+        'buffer' can be any bytes-like object, for example the buffer of a
+        'multiprocessing.shared_memory.SharedMemory'. It is read through
+        memoryviews, without copy; the 'deserialize' method of the local
+        scheme receives a memoryview on the data of each solution.
+
+        """
+        buffer = memoryview(buffer)
+        magic, number_of_solutions, costs_size = struct.unpack_from(
+                _POOL_HEADER, buffer)
+        if magic != _POOL_MAGIC:
+            raise ValueError("Not a solution pool.")
+        offset = struct.calcsize(_POOL_HEADER)
+        costs = pickle.loads(buffer[offset:offset + costs_size])
+        offset += costs_size
+        sizes = array('Q')
+        sizes.frombytes(buffer[offset:offset + 8 * number_of_solutions])
+        offset += 8 * number_of_solutions
+        for cost, size in zip(costs, sizes):
+            data = buffer[offset:offset + size]
+            offset += size
+            if hasattr(self.local_scheme, "deserialize"):
+                solution = self.local_scheme.deserialize(data)
+            else:
+                solution = pickle.loads(data)
+            self.add(solution, cost)
+
     def display_init(self, verbose):
         if verbose:
             print()
@@ -67,7 +709,7 @@ class SolutionPool:
 
     def display(self, message, start, verbose):
         if verbose:
-            value = self.local_scheme.global_cost(self.best)
+            value = self.best_cost
             if type(value) == tuple:
                 value = ', '.join(str(x) for x in value)
             print(
@@ -78,7 +720,7 @@ class SolutionPool:
     def display_end(self, start, verbose):
         if verbose:
             current_time = time.time() - start
-            value = self.local_scheme.global_cost(self.best)
+            value = self.best_cost
             # print("-"*75)
             print()
             print("Final statistics")
@@ -1,7 +1,130 @@
-from .commons import SolutionPool
+from . import commons
+from .commons import SolutionPool, Profiler, LocalSchemeWrapper, Trace
+from .commons import Termination
+from .commons import copy_solution, save_checkpoint, load_checkpoint
+from .commons import serialize_solution, deserialize_solution
 
+import collections
+import concurrent.futures
+import contextlib
+import itertools
+import multiprocessing
+import queue
+import random
 import time
-import copy
+
+
+def _run_perturbation(data, move, perturbation_seed, deadline):
+    profiler = Profiler()
+    rng = random.Random(perturbation_seed)
+    local_scheme = LocalSchemeWrapper(
+            commons._worker_local_scheme, profiler, rng, deadline)
+    # Local schemes which don't take a random number generator use the
+    # 'random' module.
+    random.seed(perturbation_seed)
+    solution = deserialize_solution(local_scheme, data)
+    local_scheme.apply_move(solution, move)
+    local_scheme.local_search(solution, move)
+    return (
+            serialize_solution(local_scheme, solution),
+            dict(profiler.number_of_calls),
+            dict(profiler.times))
+
+
+def _receive(inbox):
+    while True:
+        try:
+            yield inbox.get_nowait()
+        except queue.Empty:
+            return
+
+
+# Parameters which are not passed to the islands: they can't be sent to
+# other processes or are handled by the main process. The seed of each
+# island is drawn by the main process.
+_MAIN_PROCESS_PARAMETERS = (
+        "seed", "new_solution_callback", "metrics_sink", "solution_pool",
+        "cancellation_token", "trace", "trace_period", "trace_file",
+        "checkpoint_file", "resume_from")
+
+
+# Event set by the main process to stop the islands. It is given to the
+# worker processes when they start, since a 'multiprocessing.Event' can't be
+# sent with a task; checking it is much cheaper than checking a manager
+# event, which requires a round trip to the manager process.
+_island_stop = None
+
+
+def _init_island(stop):
+    global _island_stop
+    _island_stop = stop
+
+
+def _run_islands(
+        local_scheme, parameters, number_of_islands,
+        rng, solution_pool, termination, update_solution_pool):
+    # Each island runs its own iterated local search in a worker process.
+    # Islands are organized in a ring: each island sends its migrants to the
+    # next one. They also send their new best solutions to the main process,
+    # which stops them once a termination criterion is met.
+    stop = multiprocessing.Event()
+    with multiprocessing.Manager() as manager:
+        reports = manager.Queue()
+        inboxes = [manager.Queue() for _ in range(number_of_islands)]
+        island_parameters = {
+                key: value for key, value in parameters.items()
+                if key not in _MAIN_PROCESS_PARAMETERS}
+        island_parameters.update(
+                number_of_threads=1,
+                number_of_islands=1,
+                verbose=False)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_of_islands,
+                initializer=_init_island,
+                initargs=(stop,)) as executor:
+            futures = [
+                    executor.submit(
+                        _run_island,
+                        local_scheme,
+                        island_parameters,
+                        rng.getrandbits(64),
+                        (
+                            island_id,
+                            inboxes[island_id],
+                            inboxes[(island_id + 1) % number_of_islands],
+                            reports))
+                    for island_id in range(number_of_islands)]
+            while not all(future.done() for future in futures):
+                try:
+                    island_id, cost, data = reports.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                else:
+                    update_solution_pool(
+                            deserialize_solution(local_scheme, data), cost,
+                            "island " + str(island_id))
+                if termination.stop(0, solution_pool.best_cost):
+                    stop.set()
+                # If an island fails, the other ones are stopped; the
+                # exception is raised below.
+                if any(
+                        future.done() and future.exception() is not None
+                        for future in futures):
+                    stop.set()
+            for island_id, cost, data in _receive(reports):
+                update_solution_pool(
+                        deserialize_solution(local_scheme, data), cost,
+                        "island " + str(island_id))
+            return [future.result() for future in futures]
+
+
+def _run_island(local_scheme, parameters, seed, island):
+    output = iterated_local_search(
+            local_scheme, **parameters, seed=seed, island=island,
+            cancellation_token=_island_stop)
+    # Only the solutions of the pool are sent back, not the local scheme.
+    output["solution_pool"] = output["solution_pool"].dump()
+    return output
 
 
 def iterated_local_search(local_scheme, **parameters):
@@ -15,6 +138,18 @@ def iterated_local_search(local_scheme, **parameters):
             "maximum_number_of_restarts", float('inf'))
     minimum_number_of_perturbations = parameters.get(
             "minimum_number_of_perturbations", 1)
+    number_of_threads = parameters.get(
+            "number_of_threads", 1)
+    perturbations_batch_size = parameters.get(
+            "perturbations_batch_size", number_of_threads)
+    number_of_islands = parameters.get(
+            "number_of_islands", 1)
+    migration_period = parameters.get(
+            "migration_period", 100)
+    number_of_migrants = parameters.get(
+            "number_of_migrants", 1)
+    island = parameters.get(
+            "island", None)
     seed = parameters.get(
             "seed", 0)
     initial_solution_ids = parameters.get(
@@ -23,14 +158,44 @@ def iterated_local_search(local_scheme, **parameters):
             "initial_solutions", [])
     new_solution_callback = parameters.get(
             "new_solution_callback", None)
+    metrics_sink = parameters.get(
+            "metrics_sink", None)
+    solution_pool = parameters.get(
+            "solution_pool", None)
+    trace_period = parameters.get(
+            "trace_period", None)
+    trace_file = parameters.get(
+            "trace_file", None)
+    trace = parameters.get(
+            "trace", trace_period is not None or trace_file is not None)
+    checkpoint_file = parameters.get(
+            "checkpoint_file", None)
+    checkpoint_period = parameters.get(
+            "checkpoint_period", 60)
+    resume_from = parameters.get(
+            "resume_from", None)
     time_limit = parameters.get(
             "time_limit", float('inf'))
     verbose = parameters.get(
             "verbose", True)
 
+    if number_of_islands > 1 and (
+            checkpoint_file is not None or resume_from is not None):
+        raise ValueError(
+                "Checkpoints are not supported with several islands.")
+
     if not initial_solution_ids and not initial_solutions:
         initial_solution_ids.append(0)
 
+    # Read the checkpoint to resume from. The elapsed time of the previous
+    # runs counts towards the time limit.
+    checkpoint = None
+    if resume_from is not None:
+        checkpoint = load_checkpoint(resume_from)
+        start = time.time() - checkpoint["elapsed_time"]
+    termination = Termination(start, parameters)
+    deadline = termination.deadline if time_limit < float('inf') else None
+
     if verbose:
         print("=======================================")
         print("           LocalSearchSolver           ")
@@ -48,120 +213,360 @@ def iterated_local_search(local_scheme, **parameters):
               f"{maximum_number_of_restarts}")
         print(f"Minimum number of perturbations:  "
               f"{minimum_number_of_perturbations}")
+        print(f"Number of threads:                {number_of_threads}")
+        print(f"Perturbations batch size:         "
+              f"{perturbations_batch_size}")
+        print(f"Number of islands:                {number_of_islands}")
+        print(f"Migration period:                 {migration_period}")
+        print(f"Number of migrants:               {number_of_migrants}")
         print(f"Seed:                             {seed}")
         print(f"Maximum pool size:                {maximum_pool_size}")
         print(f"Time limit:                       {time_limit}")
+        termination.display(verbose, 34)
+        print(f"Checkpoint file:                  {checkpoint_file}")
+        print(f"Checkpoint period:                {checkpoint_period}")
+        print(f"Resume from:                      {resume_from}")
 
     # Setup structures.
-    solution_pool = SolutionPool(local_scheme, maximum_pool_size)
+    profiler = Profiler(metrics_sink)
+    # A solution pool may be given by the caller, for example to read the
+    # best solution from another thread while the search is running.
+    if solution_pool is None:
+        solution_pool = SolutionPool(
+                local_scheme, maximum_pool_size, profiler)
     solution_pool.display_init(verbose)
+    rng = random.Random(seed)
+    local_scheme = LocalSchemeWrapper(local_scheme, profiler, rng, deadline)
+    if trace:
+        trace = Trace(start, trace_period, trace_file)
+    else:
+        trace = None
+
+    # Seeds of the perturbations evaluated in worker processes are drawn from
+    # their own generator, so that the generator of the run is used in the
+    # same way as in a sequential run.
+    worker_rng = random.Random(f"workers {seed}")
 
     number_of_initial_solutions = (
             len(initial_solution_ids) + len(initial_solutions))
+    # Initial solutions which have not been used yet, with their costs.
+    # Costs are computed once, after the last local search which modified
+    # the solution, and then passed around with it.
     initial_solutions_tmp = []
     number_of_restarts = 1
     number_of_iterations = 0
-    while number_of_restarts < maximum_number_of_restarts:
-
-        # Check time limit.
-        current_time = time.time()
-        if current_time - start > time_limit:
-            break
-
-        # Generate initial solutions.
-        if not initial_solutions_tmp:
-            for initial_solution_pos in range(number_of_initial_solutions):
-                if initial_solution_pos < len(initial_solution_ids):
-                    solution = local_scheme.initial_solution(
-                            initial_solution_ids[initial_solution_pos])
+    # State of the current trajectory when resuming in the middle of it.
+    trajectory = None
+    if checkpoint is not None:
+        solution_pool.load(checkpoint["solution_pool"])
+        initial_solutions_tmp = [
+                (cost, deserialize_solution(local_scheme, data))
+                for cost, data in checkpoint["initial_solutions_tmp"]]
+        trajectory = checkpoint["trajectory"]
+        if trajectory is not None:
+            (
+                    cost, data,
+                    perturbations, perturbation_id, depth,
+                    cost_next, data_next,
+                    better_found) = trajectory
+            trajectory = (
+                    cost, deserialize_solution(local_scheme, data),
+                    perturbations, perturbation_id, depth,
+                    cost_next, deserialize_solution(local_scheme, data_next),
+                    better_found)
+        number_of_restarts = checkpoint["number_of_restarts"]
+        number_of_iterations = checkpoint["number_of_iterations"]
+        profiler.merge(*checkpoint["statistics"])
+        random.setstate(checkpoint["random_state"])
+        rng.setstate(checkpoint["rng_state"])
+        worker_rng.setstate(checkpoint["worker_rng_state"])
+        if solution_pool.best is not None:
+            solution_pool.display("resume", start, verbose)
+    next_checkpoint_time = time.time() + checkpoint_period
+
+    def write_checkpoint(trajectory):
+        # Solutions are written serialized.
+        if trajectory is not None:
+            (
+                    cost, solution,
+                    perturbations, perturbation_id, depth,
+                    cost_next, solution_next,
+                    better_found) = trajectory
+            trajectory = (
+                    cost, serialize_solution(local_scheme, solution),
+                    perturbations, perturbation_id, depth,
+                    cost_next, serialize_solution(local_scheme, solution_next),
+                    better_found)
+        save_checkpoint(checkpoint_file, {
+            "solution_pool": solution_pool.dump(),
+            "initial_solutions_tmp": [
+                (cost, serialize_solution(local_scheme, solution))
+                for cost, solution in initial_solutions_tmp],
+            "trajectory": trajectory,
+            "number_of_restarts": number_of_restarts,
+            "number_of_iterations": number_of_iterations,
+            "statistics": (
+                dict(profiler.number_of_calls),
+                dict(profiler.times)),
+            "random_state": random.getstate(),
+            "rng_state": rng.getstate(),
+            "worker_rng_state": worker_rng.getstate(),
+            "elapsed_time": time.time() - start})
+
+    def update_solution_pool(solution, cost, message, report=True):
+        # Check for a new best solution.
+        if (
+                len(solution_pool.solutions) == 0
+                or solution_pool.worst_cost > cost):
+            new_best = solution_pool.add(solution, cost)
+            if new_best == 2:
+                termination.new_best(number_of_iterations)
+                if trace is not None:
+                    trace.add(
+                            number_of_iterations,
+                            number_of_restarts,
+                            cost)
+                # Islands send their new best solutions to the main process.
+                if island is not None and report:
+                    island_id, _, _, reports = island
+                    reports.put((
+                        island_id, cost,
+                        serialize_solution(local_scheme, solution)))
+            if new_best:
+                solution_pool.display(message, start, verbose)
+                if new_solution_callback is not None:
+                    new_solution_callback(solution)
+
+    # When several threads are used, the perturbations of a batch are applied
+    # and followed by a local search in worker processes.
+    with contextlib.ExitStack() as exit_stack:
+        executor = None
+        if number_of_threads > 1 and number_of_islands <= 1:
+            executor = exit_stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(
+                        max_workers=number_of_threads,
+                        initializer=commons._init_worker,
+                        initargs=(local_scheme.local_scheme,)))
+
+        if number_of_islands > 1:
+            outputs = _run_islands(
+                    local_scheme.local_scheme, parameters, number_of_islands,
+                    rng, solution_pool, termination, update_solution_pool)
+            number_of_restarts = 0
+            for output in outputs:
+                number_of_restarts += output["number_of_restarts"]
+                number_of_iterations += output["number_of_iterations"]
+                statistics = output["statistics"]
+                profiler.merge(
+                        {phase: statistics[phase]["number_of_calls"]
+                         for phase in statistics},
+                        {phase: statistics[phase]["time"]
+                         for phase in statistics})
+                solution_pool.load(output["solution_pool"])
+            if termination.reason is None:
+                termination.reason = outputs[0]["termination"]
+        else:
+            while number_of_restarts < maximum_number_of_restarts:
+
+                # Check termination criteria.
+                if termination.stop(
+                        number_of_iterations, solution_pool.best_cost):
+                    break
+
+                # Generate initial solutions.
+                if not initial_solutions_tmp and trajectory is None:
+                    for initial_solution_pos in range(
+                            number_of_initial_solutions):
+                        if initial_solution_pos < len(initial_solution_ids):
+                            solution = local_scheme.initial_solution(
+                                    initial_solution_ids[
+                                        initial_solution_pos])
+                        else:
+                            solution = initial_solutions[
+                                    initial_solution_pos
+                                    - len(initial_solution_ids)]
+                        # Local Search.
+                        local_scheme.local_search(solution)
+
+                        # Check for a new best solution.
+                        cost = local_scheme.global_cost(solution)
+                        update_solution_pool(
+                                solution, cost,
+                                "start " + str(number_of_restarts))
+
+                        initial_solutions_tmp.append((cost, solution))
+
+                    initial_solutions_tmp.sort(
+                            key=lambda cost_solution: cost_solution[0],
+                            reverse=True)
+
+                if trajectory is None:
+                    cost, solution = initial_solutions_tmp[-1]
+                    initial_solutions_tmp.pop()
+                    perturbation_id = 0
+                    perturbations = local_scheme.perturbations(solution)
+                    # Sort moves.
+                    perturbations.sort(key=lambda move: move.global_cost)
+                    depth = 1
+                    solution_next = solution
+                    cost_next = cost
+                    better_found = False
                 else:
-                    solution = initial_solutions[
-                            initial_solution_pos - len(initial_solution_ids)]
-                # Local Search.
-                local_scheme.local_search(solution)
-
-                # Check for a new best solution.
-                if (
-                        len(solution_pool.solutions) == 0
-                        or local_scheme.global_cost(solution_pool.worst)
-                        > local_scheme.global_cost(solution)):
-                    new_best = solution_pool.add(solution)
-                    if new_best:
-                        message = "start " + str(number_of_restarts)
-                        solution_pool.display(message, start, verbose)
-                        if new_solution_callback is not None:
-                            new_solution_callback(solution)
-
-                initial_solutions_tmp.append(solution)
-
-            initial_solutions_tmp.sort(
-                    key=lambda solution: local_scheme.global_cost(solution),
-                    reverse=True)
-
-        solution = initial_solutions_tmp[-1]
-        initial_solutions_tmp.pop()
-        perturbation_id = 0
-        perturbations = local_scheme.perturbations(solution)
-        # Sort moves.
-        perturbations.sort(key=lambda move: move.global_cost)
-        depth = 1
-        solution_next = solution
-        better_found = False
-        while True:
-            number_of_iterations += 1
-
-            if perturbation_id >= minimum_number_of_perturbations \
-                    and better_found:
-                solution = solution_next
-                better_found = False
-                perturbation_id = 0
-                depth += 1
-                perturbations = local_scheme.perturbations(solution)
-                # Sort moves.
-                perturbations.sort(key=lambda move: move.global_cost)
-
-            if perturbation_id >= len(perturbations):
-                break
-
-            # Apply perturbation and local search.
-            solution_tmp = copy.deepcopy(solution)
-            move = perturbations[perturbation_id]
-            local_scheme.apply_move(solution_tmp, move)
-            local_scheme.local_search(solution_tmp, move)
-
-            # Check for a new best solution.
-            if (
-                    len(solution_pool.solutions) == 0
-                    or local_scheme.global_cost(solution_pool.worst)
-                    > local_scheme.global_cost(solution_tmp)):
-                new_best = solution_pool.add(solution_tmp)
-                if new_best:
-                    message = (
+                    (
+                            cost, solution,
+                            perturbations, perturbation_id, depth,
+                            cost_next, solution_next,
+                            better_found) = trajectory
+                    trajectory = None
+                # Solutions obtained from the next perturbations of the current
+                # batch.
+                batch = collections.deque()
+                while True:
+
+                    # Check termination criteria. The current trajectory is
+                    # kept so that it is written in the final checkpoint.
+                    if number_of_iterations >= maximum_number_of_iterations \
+                            or termination.stop(
+                                number_of_iterations,
+                                solution_pool.best_cost):
+                        if termination.reason is None:
+                            termination.reason = (
+                                    "maximum number of iterations")
+                        trajectory = (
+                                cost, solution,
+                                perturbations, perturbation_id, depth,
+                                cost_next, solution_next,
+                                better_found)
+                        break
+
+                    # Exchange solutions with the other islands. The best
+                    # solutions of the pool are sent to the next island, and
+                    # the solutions received are added to the pool and
+                    # considered as the next solution of the trajectory.
+                    if island is not None \
+                            and number_of_iterations % migration_period == 0:
+                        _, inbox, outbox, _ = island
+                        outbox.put([
+                            (
+                                cost_tmp,
+                                serialize_solution(local_scheme, solution))
+                            for cost_tmp, solution in zip(
+                                solution_pool.costs[:number_of_migrants],
+                                solution_pool.solutions[:number_of_migrants])])
+                        for migrants in _receive(inbox):
+                            for cost_tmp, data in migrants:
+                                solution_tmp = deserialize_solution(
+                                        local_scheme, data)
+                                update_solution_pool(
+                                        solution_tmp, cost_tmp,
+                                        "migration", report=False)
+                                if cost_next > cost_tmp:
+                                    solution_next = solution_tmp
+                                    cost_next = cost_tmp
+                                    better_found = True
+
+                    # Write a checkpoint.
+                    if checkpoint_file is not None \
+                            and time.time() >= next_checkpoint_time:
+                        write_checkpoint((
+                                cost, solution,
+                                perturbations, perturbation_id, depth,
+                                cost_next, solution_next,
+                                better_found))
+                        next_checkpoint_time = time.time() + checkpoint_period
+
+                    number_of_iterations += 1
+                    if trace is not None:
+                        trace.sample(
+                                number_of_iterations,
+                                number_of_restarts,
+                                solution_pool.best_cost)
+
+                    # The trajectory moves on once the solutions of the
+                    # current batch have all been evaluated, so that the
+                    # best of them is kept and none is thrown away.
+                    if perturbation_id >= minimum_number_of_perturbations \
+                            and better_found and not batch:
+                        solution = solution_next
+                        cost = cost_next
+                        better_found = False
+                        perturbation_id = 0
+                        depth += 1
+                        perturbations = local_scheme.perturbations(solution)
+                        # Sort moves.
+                        perturbations.sort(key=lambda move: move.global_cost)
+
+                    if perturbation_id >= len(perturbations):
+                        break
+
+                    # Apply perturbation and local search.
+                    if not batch:
+                        moves = perturbations[
+                                perturbation_id:
+                                perturbation_id + perturbations_batch_size]
+                        if executor is None:
+                            for move in moves:
+                                solution_tmp = copy_solution(
+                                        local_scheme, solution)
+                                local_scheme.apply_move(solution_tmp, move)
+                                local_scheme.local_search(solution_tmp, move)
+                                batch.append(solution_tmp)
+                        else:
+                            results = executor.map(
+                                    _run_perturbation,
+                                    itertools.repeat(serialize_solution(
+                                        local_scheme, solution)),
+                                    moves,
+                                    [
+                                        worker_rng.getrandbits(64)
+                                        for _ in moves],
+                                    itertools.repeat(deadline))
+                            for data, number_of_calls, times in results:
+                                profiler.merge(number_of_calls, times)
+                                batch.append(deserialize_solution(
+                                    local_scheme, data))
+                    solution_tmp = batch.popleft()
+
+                    # Check for a new best solution.
+                    cost_tmp = local_scheme.global_cost(solution_tmp)
+                    update_solution_pool(
+                            solution_tmp, cost_tmp,
                             "start " + str(number_of_restarts)
                             + " iteration " + str(number_of_iterations))
-                    solution_pool.display(message, start, verbose)
-                    if new_solution_callback is not None:
-                        new_solution_callback(solution_tmp)
 
-            if (
-                    local_scheme.global_cost(solution_next)
-                    > local_scheme.global_cost(solution_tmp)):
-                solution_next = solution_tmp
-                better_found = True
+                    if cost_next > cost_tmp:
+                        solution_next = solution_tmp
+                        cost_next = cost_tmp
+                        better_found = True
+
+                    perturbation_id += 1
+
+                if trajectory is not None:
+                    break
+                number_of_restarts += 1
 
-            perturbation_id += 1
+    if termination.reason is None:
+        termination.reason = "maximum number of restarts"
 
-        number_of_restarts += 1
+    if checkpoint_file is not None:
+        write_checkpoint(trajectory)
 
     # Final display.
     solution_pool.display_end(start, verbose)
     if verbose:
         print(f"Number of restarts:          {number_of_restarts}")
         print(f"Number of iterations:        {number_of_iterations}")
+        print(f"Termination:                 {termination.reason}")
+    profiler.display(verbose)
+    if trace is not None:
+        trace.close()
 
     end = time.time()
 
     return {"solution_pool": solution_pool,
             "number_of_restarts": number_of_restarts,
             "number_of_iterations": number_of_iterations,
+            "termination": termination.reason,
+            "statistics": profiler.output(),
+            "trace": trace.output() if trace is not None else None,
             "elapsed_time": end - start}
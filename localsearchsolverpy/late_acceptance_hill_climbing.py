@@ -0,0 +1,192 @@
+from .commons import SolutionPool, Profiler, LocalSchemeWrapper, Trace
+from .commons import Termination
+from .commons import add_cost
+
+import functools
+import random
+import time
+
+
+# Late acceptance hill climbing (Burke and Bykov).
+#
+# Instead of descents to local optima, single random moves are sampled and
+# evaluated through their cost differences. It requires the local scheme to
+# provide:
+# - 'random_move(solution)', which returns a random move of the
+#   neighborhood of the solution; it may take a 'rng' argument;
+# - 'cost_delta(solution, move)', which returns the difference between the
+#   cost of the solution after applying the move and its current cost. For
+#   tuple costs, it is the tuple of the differences;
+# - 'apply_move(solution, move)'.
+#
+# A move is accepted if the new cost is not worse than the current cost, or
+# than the cost of the current solution 'history_length' iterations earlier.
+
+
+def late_acceptance_hill_climbing(local_scheme, **parameters):
+    # Read parameters.
+    start = time.time()
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    maximum_number_of_iterations = parameters.get(
+            "maximum_number_of_iterations", float('inf'))
+    history_length = parameters.get(
+            "history_length", 1000)
+    seed = parameters.get(
+            "seed", 0)
+    initial_solution_ids = parameters.get(
+            "initial_solution_ids", [])
+    initial_solutions = parameters.get(
+            "initial_solutions", [])
+    new_solution_callback = parameters.get(
+            "new_solution_callback", None)
+    metrics_sink = parameters.get(
+            "metrics_sink", None)
+    solution_pool = parameters.get(
+            "solution_pool", None)
+    trace_period = parameters.get(
+            "trace_period", None)
+    trace_file = parameters.get(
+            "trace_file", None)
+    trace = parameters.get(
+            "trace", trace_period is not None or trace_file is not None)
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    verbose = parameters.get(
+            "verbose", True)
+
+    termination = Termination(start, parameters)
+
+    if verbose:
+        print("=======================================")
+        print("           LocalSearchSolver           ")
+        print("=======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Late acceptance hill climbing")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Maximum number of iterations:  "
+              f"{maximum_number_of_iterations}")
+        print(f"History length:                {history_length}")
+        print(f"Seed:                          {seed}")
+        print(f"Maximum pool size:             {maximum_pool_size}")
+        print(f"Time limit:                    {time_limit}")
+        termination.display(verbose, 31)
+
+    # Setup structures.
+    profiler = Profiler(metrics_sink)
+    if solution_pool is None:
+        solution_pool = SolutionPool(
+                local_scheme, maximum_pool_size, profiler)
+    solution_pool.display_init(verbose)
+    rng = random.Random(seed)
+    local_scheme = LocalSchemeWrapper(local_scheme, profiler, rng)
+    if trace:
+        trace = Trace(start, trace_period, trace_file)
+    else:
+        trace = None
+
+    # The methods called at each iteration are not measured one call at a
+    # time, the time spent in them is measured by blocks of iterations.
+    random_move = functools.partial(
+            local_scheme.local_scheme.random_move,
+            **local_scheme.arguments.get("random_move", {}))
+    cost_delta = local_scheme.local_scheme.cost_delta
+    apply_move = local_scheme.local_scheme.apply_move
+    # Number of iterations between two checks of the termination criteria.
+    check_period = 64
+
+    def update_solution_pool(solution, cost, number_of_iterations):
+        # Check for a new best solution. The current solution keeps being
+        # modified, so a copy is added to the pool.
+        if (
+                len(solution_pool.solutions) == 0
+                or solution_pool.worst_cost > cost):
+            solution = local_scheme.copy_solution(solution)
+            new_best = solution_pool.add(solution, cost)
+            if new_best == 2:
+                termination.new_best(number_of_iterations)
+                if trace is not None:
+                    trace.add(number_of_iterations, 0, cost)
+            if new_best:
+                message = "iteration " + str(number_of_iterations)
+                solution_pool.display(message, start, verbose)
+                if new_solution_callback is not None:
+                    new_solution_callback(solution)
+
+    # Generate the initial solution.
+    if initial_solution_ids or not initial_solutions:
+        solution = local_scheme.initial_solution(
+                initial_solution_ids[0] if initial_solution_ids else 0)
+    else:
+        solution = local_scheme.copy_solution(initial_solutions[0])
+    cost = local_scheme.global_cost(solution)
+    update_solution_pool(solution, cost, 0)
+
+    # Costs of the current solution during the last iterations.
+    history = [cost] * history_length
+    number_of_iterations = 0
+    number_of_accepted_moves = 0
+    # The current solution is only copied into the solution pool when it is
+    # about to get worse or at the end of a block of iterations, rather than
+    # after each improving move.
+    pending = False
+    while True:
+        if pending:
+            update_solution_pool(solution, cost, number_of_iterations)
+            pending = False
+
+        # Check termination criteria.
+        if number_of_iterations >= maximum_number_of_iterations:
+            termination.reason = "maximum number of iterations"
+            break
+        if termination.stop(number_of_iterations, solution_pool.best_cost):
+            break
+        if trace is not None:
+            trace.sample(number_of_iterations, 0, solution_pool.best_cost)
+
+        block_start = time.perf_counter()
+        block_size = int(min(
+                check_period,
+                maximum_number_of_iterations - number_of_iterations))
+        for _ in range(block_size):
+            move = random_move(solution)
+            cost_tmp = add_cost(cost, cost_delta(solution, move))
+            history_pos = number_of_iterations % history_length
+            if cost_tmp <= cost or cost_tmp <= history[history_pos]:
+                if pending and cost_tmp > cost:
+                    update_solution_pool(solution, cost, number_of_iterations)
+                    pending = False
+                apply_move(solution, move)
+                cost = cost_tmp
+                number_of_accepted_moves += 1
+                if solution_pool.worst_cost > cost:
+                    pending = True
+            history[history_pos] = cost
+            number_of_iterations += 1
+        profiler.merge(
+                {"moves": block_size},
+                {"moves": time.perf_counter() - block_start})
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of iterations:        {number_of_iterations}")
+        print(f"Number of accepted moves:    {number_of_accepted_moves}")
+        print(f"Termination:                 {termination.reason}")
+    profiler.display(verbose)
+    if trace is not None:
+        trace.close()
+
+    end = time.time()
+
+    return {"solution_pool": solution_pool,
+            "number_of_iterations": number_of_iterations,
+            "number_of_accepted_moves": number_of_accepted_moves,
+            "termination": termination.reason,
+            "statistics": profiler.output(),
+            "trace": trace.output() if trace is not None else None,
+            "elapsed_time": end - start}
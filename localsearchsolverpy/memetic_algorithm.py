@@ -0,0 +1,291 @@
+from . import commons
+from .commons import SolutionPool, Profiler, LocalSchemeWrapper, Trace
+from .commons import Termination
+from .commons import serialize_solution, deserialize_solution
+
+import bisect
+import concurrent.futures
+import contextlib
+import itertools
+import random
+import time
+
+
+# Memetic algorithm.
+#
+# The population is a solution pool of 'population_size' solutions. At each
+# iteration, two parents are selected by binary tournament, an offspring is
+# built with the 'crossover(solution_1, solution_2)' method of the local
+# scheme, which may take a 'rng' argument and must not modify the parents,
+# and it is improved with 'local_search'.
+#
+# The offspring is then inserted in the population. Duplicates are rejected.
+# If the local scheme provides 'solution_distance(solution_1, solution_2)',
+# the offspring replaces the solution closest to it among the ones which are
+# worse than it, which preserves the diversity of the population.
+# Otherwise, it replaces the worst solution.
+#
+# When several threads are used, the offspring of a generation are built
+# and improved in worker processes.
+
+
+def _run_offspring(data_1, data_2, offspring_seed, deadline):
+    profiler = Profiler()
+    rng = random.Random(offspring_seed)
+    local_scheme = LocalSchemeWrapper(
+            commons._worker_local_scheme, profiler, rng, deadline)
+    # Local schemes which don't take a random number generator use the
+    # 'random' module.
+    random.seed(offspring_seed)
+    solution = local_scheme.crossover(
+            deserialize_solution(local_scheme, data_1),
+            deserialize_solution(local_scheme, data_2))
+    local_scheme.local_search(solution)
+    return (
+            serialize_solution(local_scheme, solution),
+            dict(profiler.number_of_calls),
+            dict(profiler.times))
+
+
+def memetic_algorithm(local_scheme, **parameters):
+    # Read parameters.
+    start = time.time()
+    population_size = parameters.get(
+            "population_size", 20)
+    maximum_number_of_iterations = parameters.get(
+            "maximum_number_of_iterations", float('inf'))
+    number_of_threads = parameters.get(
+            "number_of_threads", 1)
+    seed = parameters.get(
+            "seed", 0)
+    initial_solution_ids = parameters.get(
+            "initial_solution_ids", [])
+    initial_solutions = parameters.get(
+            "initial_solutions", [])
+    new_solution_callback = parameters.get(
+            "new_solution_callback", None)
+    metrics_sink = parameters.get(
+            "metrics_sink", None)
+    solution_pool = parameters.get(
+            "solution_pool", None)
+    trace_period = parameters.get(
+            "trace_period", None)
+    trace_file = parameters.get(
+            "trace_file", None)
+    trace = parameters.get(
+            "trace", trace_period is not None or trace_file is not None)
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    verbose = parameters.get(
+            "verbose", True)
+
+    termination = Termination(start, parameters)
+    deadline = termination.deadline if time_limit < float('inf') else None
+
+    if not initial_solution_ids and not initial_solutions:
+        initial_solution_ids = [0]
+
+    if verbose:
+        print("=======================================")
+        print("           LocalSearchSolver           ")
+        print("=======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Memetic algorithm")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Population size:               {population_size}")
+        print(f"Maximum number of iterations:  "
+              f"{maximum_number_of_iterations}")
+        print(f"Number of threads:             {number_of_threads}")
+        print(f"Seed:                          {seed}")
+        print(f"Time limit:                    {time_limit}")
+        termination.display(verbose, 31)
+
+    # Setup structures.
+    profiler = Profiler(metrics_sink)
+    # A solution pool given by the caller, for example by 'Solver', receives
+    # the solutions added to the population but doesn't replace it, since
+    # its size is not related to the population size.
+    population = SolutionPool(local_scheme, population_size, profiler)
+    if solution_pool is None:
+        solution_pool = population
+    solution_pool.display_init(verbose)
+    rng = random.Random(seed)
+    local_scheme = LocalSchemeWrapper(local_scheme, profiler, rng, deadline)
+    if trace:
+        trace = Trace(start, trace_period, trace_file)
+    else:
+        trace = None
+    solution_distance = getattr(
+            local_scheme.local_scheme, "solution_distance", None)
+
+    with contextlib.ExitStack() as exit_stack:
+        executor = None
+        if number_of_threads > 1:
+            executor = exit_stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(
+                        max_workers=number_of_threads,
+                        initializer=commons._init_worker,
+                        initargs=(local_scheme.local_scheme,)))
+
+        def update_population(solution, cost, message):
+            status = 0
+            if solution_distance is not None \
+                    and len(population.solutions) >= population.maximum_size:
+                # Replace the solution closest to the offspring among the ones
+                # which are worse than it.
+                replacement_start = time.perf_counter()
+                position_min = bisect.bisect_right(population.costs, cost)
+                if position_min < len(population.solutions):
+                    position = min(
+                            range(position_min, len(population.solutions)),
+                            key=lambda position: solution_distance(
+                                solution, population.solutions[position]))
+                    removed, removed_cost = population.remove(position)
+                    status = population.add(solution, cost)
+                    if status == 0:
+                        population.add(removed, removed_cost)
+                profiler.add(
+                        "replacement", time.perf_counter() - replacement_start)
+            else:
+                status = population.add(solution, cost)
+            if status and population is not solution_pool:
+                solution_pool.add(solution, cost)
+            if status == 2:
+                termination.new_best(number_of_iterations)
+                if trace is not None:
+                    trace.add(number_of_iterations, 0, cost)
+            if status:
+                if status == 2:
+                    solution_pool.display(message, start, verbose)
+                if new_solution_callback is not None:
+                    new_solution_callback(solution)
+
+        # Generate the initial population.
+        number_of_iterations = 0
+        initial_solutions_tmp = []
+        for initial_solution_pos in range(population_size):
+            if initial_solution_pos < len(initial_solutions):
+                initial_solutions_tmp.append(
+                        initial_solutions[initial_solution_pos])
+            else:
+                initial_solutions_tmp.append(None)
+        if executor is None:
+            for initial_solution_pos, solution in enumerate(
+                    initial_solutions_tmp):
+                if termination.stop(0, solution_pool.best_cost):
+                    break
+                if solution is None:
+                    solution = local_scheme.initial_solution(
+                            initial_solution_ids[
+                                initial_solution_pos
+                                % len(initial_solution_ids)])
+                local_scheme.local_search(solution)
+                update_population(
+                        solution, local_scheme.global_cost(solution),
+                        "initial solution " + str(initial_solution_pos))
+        else:
+            results = executor.map(
+                    commons._run_restart,
+                    [rng.getrandbits(64) for _ in initial_solutions_tmp],
+                    [
+                        initial_solution_ids[
+                            initial_solution_pos % len(initial_solution_ids)]
+                        for initial_solution_pos in range(population_size)],
+                    [
+                        serialize_solution(local_scheme, solution)
+                        if solution is not None else None
+                        for solution in initial_solutions_tmp],
+                    itertools.repeat(deadline))
+            for initial_solution_pos, (data, number_of_calls, times) in (
+                    enumerate(results)):
+                profiler.merge(number_of_calls, times)
+                solution = deserialize_solution(local_scheme, data)
+                update_population(
+                        solution, local_scheme.global_cost(solution),
+                        "initial solution " + str(initial_solution_pos))
+
+        def select():
+            # Binary tournament. The pool is sorted from the best solution to
+            # the worst one.
+            position_1 = rng.randrange(len(population.solutions))
+            position_2 = rng.randrange(len(population.solutions))
+            return min(position_1, position_2)
+
+        while True:
+
+            # Check termination criteria.
+            if number_of_iterations >= maximum_number_of_iterations:
+                termination.reason = "maximum number of iterations"
+                break
+            if termination.stop(number_of_iterations, solution_pool.best_cost):
+                break
+            if len(population.solutions) < 2:
+                termination.reason = "population too small"
+                break
+            if trace is not None:
+                trace.sample(number_of_iterations, 0, solution_pool.best_cost)
+
+            # Select the parents of the offspring of the generation.
+            generation_size = int(min(
+                    number_of_threads,
+                    maximum_number_of_iterations - number_of_iterations))
+            parents = []
+            for _ in range(generation_size):
+                position_1 = select()
+                position_2 = select()
+                while position_2 == position_1:
+                    position_2 = select()
+                parents.append((
+                    population.solutions[position_1],
+                    population.solutions[position_2]))
+
+            # Build and improve the offspring.
+            offspring = []
+            if executor is None:
+                for parent_1, parent_2 in parents:
+                    solution = local_scheme.crossover(parent_1, parent_2)
+                    local_scheme.local_search(solution)
+                    offspring.append(solution)
+            else:
+                results = executor.map(
+                        _run_offspring,
+                        [
+                            serialize_solution(local_scheme, parent_1)
+                            for parent_1, _ in parents],
+                        [
+                            serialize_solution(local_scheme, parent_2)
+                            for _, parent_2 in parents],
+                        [rng.getrandbits(64) for _ in parents],
+                        itertools.repeat(deadline))
+                for data, number_of_calls, times in results:
+                    profiler.merge(number_of_calls, times)
+                    offspring.append(deserialize_solution(local_scheme, data))
+
+            # Insert the offspring in the population.
+            for solution in offspring:
+                number_of_iterations += 1
+                update_population(
+                        solution, local_scheme.global_cost(solution),
+                        "iteration " + str(number_of_iterations))
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of iterations:        {number_of_iterations}")
+        print(f"Termination:                 {termination.reason}")
+    profiler.display(verbose)
+    if trace is not None:
+        trace.close()
+
+    end = time.time()
+
+    return {"solution_pool": solution_pool,
+            "number_of_iterations": number_of_iterations,
+            "termination": termination.reason,
+            "statistics": profiler.output(),
+            "trace": trace.output() if trace is not None else None,
+            "elapsed_time": end - start}
@@ -1,8 +1,29 @@
-from .commons import SolutionPool
+from . import commons
+from .commons import SolutionPool, Profiler, LocalSchemeWrapper, Trace
+from .commons import Termination
+from .commons import serialize_solution, deserialize_solution
 
+import concurrent.futures
+import random
 import time
 
 
+# Restarting local search.
+#
+# If 'batch_size' is greater than 1 and the local scheme provides the
+# methods below, restarts are run by batches of 'batch_size' solutions,
+# which are improved together, for example with vectorized operations:
+# - 'initial_solutions_batch(number_of_solutions)', which returns a batch of
+#   random initial solutions, for example as the rows of a 2-D NumPy array;
+#   it may take a 'rng' argument;
+# - 'local_search_batch(solutions)', which improves the solutions of a batch
+#   in place; it may take a 'deadline' argument;
+# - 'solutions_from_batch(solutions)', which returns the list of the
+#   solutions of a batch.
+# The batched mode is only used with a single thread and without initial
+# solutions given as parameter.
+
+
 def restarting_local_search(local_scheme, **parameters):
     # Read parameters.
     start = time.time()
@@ -10,6 +31,10 @@ def restarting_local_search(local_scheme, **parameters):
             "maximum_pool_size", 1)
     maximum_number_of_restarts = parameters.get(
             "maximum_number_of_restarts", float('inf'))
+    number_of_threads = parameters.get(
+            "number_of_threads", 1)
+    batch_size = parameters.get(
+            "batch_size", 1)
     seed = parameters.get(
             "seed", 0)
     initial_solution_ids = parameters.get(
@@ -18,11 +43,24 @@ def restarting_local_search(local_scheme, **parameters):
             "initial_solutions", [])
     new_solution_callback = parameters.get(
             "new_solution_callback", None)
+    metrics_sink = parameters.get(
+            "metrics_sink", None)
+    solution_pool = parameters.get(
+            "solution_pool", None)
+    trace_period = parameters.get(
+            "trace_period", None)
+    trace_file = parameters.get(
+            "trace_file", None)
+    trace = parameters.get(
+            "trace", trace_period is not None or trace_file is not None)
     time_limit = parameters.get(
             "time_limit", float('inf'))
     verbose = parameters.get(
             "verbose", True)
 
+    termination = Termination(start, parameters)
+    deadline = termination.deadline if time_limit < float('inf') else None
+
     if not initial_solution_ids and not initial_solutions:
         initial_solution_ids.append(0)
 
@@ -38,58 +76,185 @@ def restarting_local_search(local_scheme, **parameters):
         print("Parameters")
         print("----------")
         print(f"Maximum number of restarts:  {maximum_number_of_restarts}")
+        print(f"Number of threads:           {number_of_threads}")
+        print(f"Batch size:                  {batch_size}")
         print(f"Seed:                        {seed}")
         print(f"Maximum pool size:           {maximum_pool_size}")
         print(f"Time limit:                  {time_limit}")
+        termination.display(verbose, 29)
 
     # Setup structures.
-    solution_pool = SolutionPool(local_scheme, maximum_pool_size)
+    profiler = Profiler(metrics_sink)
+    # A solution pool may be given by the caller, for example to read the
+    # best solution from another thread while the search is running.
+    if solution_pool is None:
+        solution_pool = SolutionPool(
+                local_scheme, maximum_pool_size, profiler)
     solution_pool.display_init(verbose)
+    rng = random.Random(seed)
+    local_scheme = LocalSchemeWrapper(local_scheme, profiler, rng, deadline)
+    if trace:
+        trace = Trace(start, trace_period, trace_file)
+    else:
+        trace = None
 
     number_of_initial_solutions = (
             len(initial_solution_ids) + len(initial_solutions))
-    number_of_restarts = 1
-    while number_of_restarts < maximum_number_of_restarts:
-
-        # Check time limit.
-        current_time = time.time()
-        if current_time - start > time_limit:
-            break
-
-        # Generate initial solution.
-        initial_solution_pos = (
-                (number_of_restarts - 1)
-                % number_of_initial_solutions)
-        if initial_solution_pos < len(initial_solution_ids):
-            solution = local_scheme.initial_solution(
-                    initial_solution_ids[initial_solution_pos])
-        else:
-            solution = initial_solutions[
-                    initial_solution_pos - len(initial_solution_ids)]
-        # Local Search.
-        local_scheme.local_search(solution)
+    batched = (
+            batch_size > 1
+            and number_of_threads <= 1
+            and not initial_solutions
+            and hasattr(local_scheme.local_scheme, "initial_solutions_batch")
+            and hasattr(local_scheme.local_scheme, "local_search_batch")
+            and hasattr(local_scheme.local_scheme, "solutions_from_batch"))
 
+    def update_solution_pool(solution, restart):
         # Check for a new best solution.
+        cost = local_scheme.global_cost(solution)
         if (
                 len(solution_pool.solutions) == 0
-                or local_scheme.global_cost(solution_pool.worst)
-                > local_scheme.global_cost(solution)):
-            new_best = solution_pool.add(solution)
+                or solution_pool.worst_cost > cost):
+            new_best = solution_pool.add(solution, cost)
+            if new_best == 2:
+                termination.new_best(restart)
+                if trace is not None:
+                    trace.add(restart, restart, cost)
             if new_best:
-                message = "start " + str(number_of_restarts)
+                message = "start " + str(restart)
                 solution_pool.display(message, start, verbose)
                 if new_solution_callback is not None:
                     new_solution_callback(solution)
 
-        number_of_restarts += 1
+    number_of_restarts = 1
+    if batched:
+        while number_of_restarts < maximum_number_of_restarts:
+
+            # Check termination criteria.
+            if termination.stop(number_of_restarts, solution_pool.best_cost):
+                break
+
+            # Generate a batch of initial solutions and improve them
+            # together.
+            number_of_solutions = int(min(
+                    batch_size,
+                    maximum_number_of_restarts - number_of_restarts))
+            solutions = local_scheme.initial_solutions_batch(
+                    number_of_solutions)
+            local_scheme.local_search_batch(solutions)
+
+            for solution in local_scheme.solutions_from_batch(solutions):
+                update_solution_pool(solution, number_of_restarts)
+                number_of_restarts += 1
+            if trace is not None:
+                trace.sample(
+                        number_of_restarts - 1,
+                        number_of_restarts - 1,
+                        solution_pool.best_cost)
+
+    elif number_of_threads <= 1:
+        while number_of_restarts < maximum_number_of_restarts:
+
+            # Check termination criteria.
+            if termination.stop(number_of_restarts, solution_pool.best_cost):
+                break
+
+            # Generate initial solution.
+            initial_solution_pos = (
+                    (number_of_restarts - 1)
+                    % number_of_initial_solutions)
+            if initial_solution_pos < len(initial_solution_ids):
+                solution = local_scheme.initial_solution(
+                        initial_solution_ids[initial_solution_pos])
+            else:
+                solution = initial_solutions[
+                        initial_solution_pos - len(initial_solution_ids)]
+            # Local Search.
+            local_scheme.local_search(solution)
+
+            update_solution_pool(solution, number_of_restarts)
+            if trace is not None:
+                trace.sample(
+                        number_of_restarts,
+                        number_of_restarts,
+                        solution_pool.best_cost)
+
+            number_of_restarts += 1
+
+    else:
+        # Each restart is run in a worker process with its own copy of the
+        # local scheme and its own seed. The solutions are sent back to the
+        # main process which maintains the solution pool.
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=number_of_threads,
+                initializer=commons._init_worker,
+                initargs=(local_scheme.local_scheme,)) as executor:
+            futures = {}
+            while True:
+
+                # Submit new restarts while there are idle workers.
+                while (
+                        len(futures) < number_of_threads
+                        and number_of_restarts < maximum_number_of_restarts
+                        and termination.stop(
+                            number_of_restarts,
+                            solution_pool.best_cost) is None):
+                    initial_solution_pos = (
+                            (number_of_restarts - 1)
+                            % number_of_initial_solutions)
+                    if initial_solution_pos < len(initial_solution_ids):
+                        initial_solution_id = initial_solution_ids[
+                                initial_solution_pos]
+                        initial_solution = None
+                    else:
+                        initial_solution_id = None
+                        initial_solution = serialize_solution(
+                                local_scheme,
+                                initial_solutions[
+                                    initial_solution_pos
+                                    - len(initial_solution_ids)])
+                    future = executor.submit(
+                            commons._run_restart,
+                            rng.getrandbits(64),
+                            initial_solution_id,
+                            initial_solution,
+                            deadline)
+                    futures[future] = number_of_restarts
+                    number_of_restarts += 1
+
+                if not futures:
+                    break
+
+                # Collect the restarts which are over.
+                done, _ = concurrent.futures.wait(
+                        futures,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    restart = futures.pop(future)
+                    data, number_of_calls, times = future.result()
+                    profiler.merge(number_of_calls, times)
+                    solution = deserialize_solution(local_scheme, data)
+                    update_solution_pool(solution, restart)
+                    if trace is not None:
+                        trace.sample(
+                                restart, restart, solution_pool.best_cost)
+
+    if termination.reason is None:
+        termination.reason = "maximum number of restarts"
 
     # Final display.
     solution_pool.display_end(start, verbose)
     if verbose:
         print(f"Number of restarts:          {number_of_restarts}")
+        print(f"Termination:                 {termination.reason}")
+    profiler.display(verbose)
+    if trace is not None:
+        trace.close()
 
     end = time.time()
 
     return {"solution_pool": solution_pool,
             "number_of_restarts": number_of_restarts,
+            "termination": termination.reason,
+            "statistics": profiler.output(),
+            "trace": trace.output() if trace is not None else None,
             "elapsed_time": end - start}
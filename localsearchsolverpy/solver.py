@@ -0,0 +1,110 @@
+from .commons import SolutionPool
+
+import asyncio
+import concurrent.futures
+import threading
+
+
+class Solver:
+    """Run an algorithm in the background.
+
+    'algorithm' is one of the algorithms of the package, for example
+    'iterated_local_search', and the parameters are passed to it unchanged.
+    The search runs in a thread; it can be stopped at any moment with 'stop',
+    in which case it returns between two iterations, with 'cancelled' as
+    termination reason.
+
+    Example:
+        solver = Solver(iterated_local_search, local_scheme, verbose=False)
+        solver.start()
+        ...
+        solution, cost = solver.best()
+        solver.stop()
+        output = solver.wait()
+
+    Or, from a coroutine:
+        output = await Solver(iterated_local_search, local_scheme).solve()
+
+    """
+
+    def __init__(self, algorithm, local_scheme, **parameters):
+        self.algorithm = algorithm
+        self.local_scheme = local_scheme
+        self.parameters = parameters
+        if parameters.get("cancellation_token", None) is None:
+            parameters["cancellation_token"] = threading.Event()
+        self.cancellation_token = parameters["cancellation_token"]
+        # The solution pool is created here so that the best solution can be
+        # read while the search is running.
+        if parameters.get("solution_pool", None) is None:
+            parameters["solution_pool"] = SolutionPool(
+                    local_scheme,
+                    parameters.get("maximum_pool_size", 1))
+        self.solution_pool = parameters["solution_pool"]
+        self.future = None
+
+    def _run(self):
+        return self.algorithm(self.local_scheme, **self.parameters)
+
+    def start(self, executor=None):
+        """Start the search in 'executor', or in a new thread if None.
+
+        Return the 'concurrent.futures.Future' of the output of the
+        algorithm.
+
+        """
+        if self.future is not None:
+            raise RuntimeError("The solver has already been started.")
+        if executor is not None:
+            self.future = executor.submit(self._run)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            self.future = executor.submit(self._run)
+            executor.shutdown(wait=False)
+        return self.future
+
+    def stop(self):
+        """Ask the search to stop. It doesn't wait for it to be over."""
+        self.cancellation_token.set()
+
+    def poll(self):
+        """Return the output of the algorithm if it is over, None otherwise.
+
+        If the algorithm raised an exception, it is raised again here.
+
+        """
+        if self.future is None or not self.future.done():
+            return None
+        return self.future.result()
+
+    def wait(self, timeout=None):
+        """Wait for the search to be over and return its output."""
+        return self.future.result(timeout)
+
+    def running(self):
+        return self.future is not None and not self.future.done()
+
+    def best(self):
+        """Return the best solution found so far and its cost.
+
+        Solutions in the pool are not modified by the algorithms once they
+        have been added, so the returned solution can be read while the
+        search goes on. The solution and its cost are read together, so they
+        always match.
+
+        """
+        return self.solution_pool.best_snapshot
+
+    async def solve(self, executor=None):
+        """Start the search and wait for its output without blocking the
+        event loop.
+
+        If the coroutine is cancelled, the search is stopped.
+
+        """
+        future = asyncio.wrap_future(self.start(executor))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            self.stop()
+            raise
@@ -0,0 +1,252 @@
+from .commons import SolutionPool, Profiler, LocalSchemeWrapper, Trace
+from .commons import Termination
+from .commons import add_cost
+
+import math
+import random
+import time
+
+
+# Tabu search.
+#
+# At each iteration, the best move of the neighborhood of the current
+# solution which is not tabu is applied, even if it worsens the cost. It
+# requires the local scheme to provide the move interface used by
+# 'commons.descent': 'neighbors', 'cost_delta' (or 'cost_deltas') and
+# 'apply_move'.
+#
+# The tabu list stores attributes of the moves applied recently, given by
+# the optional 'move_attributes(solution, move)' method of the local scheme
+# (by default, the move itself). A move is tabu if one of its attributes is;
+# it is allowed anyway if it leads to a new best solution (aspiration).
+#
+# The tenure is adapted as in reactive tabu search: it increases when the
+# search comes back to a solution visited recently, and decreases when it
+# hasn't happened for a while. Visited solutions are identified by their
+# cost and, if the local scheme provides 'solution_key', by the hash of their
+# key.
+
+
+def tabu_search(local_scheme, **parameters):
+    # Read parameters.
+    start = time.time()
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    maximum_number_of_iterations = parameters.get(
+            "maximum_number_of_iterations", float('inf'))
+    minimum_tenure = parameters.get(
+            "minimum_tenure", 5)
+    maximum_tenure = parameters.get(
+            "maximum_tenure", 100)
+    tenure_decrease_period = parameters.get(
+            "tenure_decrease_period", 100)
+    seed = parameters.get(
+            "seed", 0)
+    initial_solution_ids = parameters.get(
+            "initial_solution_ids", [])
+    initial_solutions = parameters.get(
+            "initial_solutions", [])
+    new_solution_callback = parameters.get(
+            "new_solution_callback", None)
+    metrics_sink = parameters.get(
+            "metrics_sink", None)
+    solution_pool = parameters.get(
+            "solution_pool", None)
+    trace_period = parameters.get(
+            "trace_period", None)
+    trace_file = parameters.get(
+            "trace_file", None)
+    trace = parameters.get(
+            "trace", trace_period is not None or trace_file is not None)
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    verbose = parameters.get(
+            "verbose", True)
+
+    termination = Termination(start, parameters)
+
+    if verbose:
+        print("=======================================")
+        print("           LocalSearchSolver           ")
+        print("=======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Tabu search")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Maximum number of iterations:  "
+              f"{maximum_number_of_iterations}")
+        print(f"Minimum tenure:                {minimum_tenure}")
+        print(f"Maximum tenure:                {maximum_tenure}")
+        print(f"Tenure decrease period:        {tenure_decrease_period}")
+        print(f"Seed:                          {seed}")
+        print(f"Maximum pool size:             {maximum_pool_size}")
+        print(f"Time limit:                    {time_limit}")
+        termination.display(verbose, 31)
+
+    # Setup structures.
+    profiler = Profiler(metrics_sink)
+    if solution_pool is None:
+        solution_pool = SolutionPool(
+                local_scheme, maximum_pool_size, profiler)
+    solution_pool.display_init(verbose)
+    rng = random.Random(seed)
+    local_scheme = LocalSchemeWrapper(local_scheme, profiler, rng)
+    if trace:
+        trace = Trace(start, trace_period, trace_file)
+    else:
+        trace = None
+
+    cost_deltas = getattr(local_scheme.local_scheme, "cost_deltas", None)
+    cost_delta = getattr(local_scheme.local_scheme, "cost_delta", None)
+    move_attributes = getattr(
+            local_scheme.local_scheme, "move_attributes",
+            lambda solution, move: (move,))
+    solution_key = getattr(
+            local_scheme.local_scheme, "solution_key",
+            lambda solution: None)
+
+    def update_solution_pool(solution, cost, number_of_iterations):
+        # Check for a new best solution. The current solution keeps being
+        # modified, so a copy is added to the pool.
+        if (
+                len(solution_pool.solutions) == 0
+                or solution_pool.worst_cost > cost):
+            solution = local_scheme.copy_solution(solution)
+            new_best = solution_pool.add(solution, cost)
+            if new_best == 2:
+                termination.new_best(number_of_iterations)
+                if trace is not None:
+                    trace.add(number_of_iterations, 0, cost)
+            if new_best:
+                message = "iteration " + str(number_of_iterations)
+                solution_pool.display(message, start, verbose)
+                if new_solution_callback is not None:
+                    new_solution_callback(solution)
+
+    # Generate the initial solution.
+    if initial_solution_ids or not initial_solutions:
+        solution = local_scheme.initial_solution(
+                initial_solution_ids[0] if initial_solution_ids else 0)
+    else:
+        solution = local_scheme.copy_solution(initial_solutions[0])
+    cost = local_scheme.global_cost(solution)
+    update_solution_pool(solution, cost, 0)
+
+    # Iteration until which each attribute is tabu.
+    tabu = {}
+    tenure = minimum_tenure
+    # Last iteration at which each solution has been visited.
+    visited = {}
+    last_tenure_change = 0
+    number_of_iterations = 0
+    while True:
+
+        # Check termination criteria.
+        if number_of_iterations >= maximum_number_of_iterations:
+            termination.reason = "maximum number of iterations"
+            break
+        if termination.stop(number_of_iterations, solution_pool.best_cost):
+            break
+        if trace is not None:
+            trace.sample(number_of_iterations, 0, solution_pool.best_cost)
+
+        # Find the best admissible move.
+        neighborhood_start = time.perf_counter()
+        if cost_deltas is not None:
+            moves = list(local_scheme.neighbors(solution))
+            moves_deltas = zip(moves, cost_deltas(solution, moves))
+        else:
+            moves_deltas = (
+                    (move, cost_delta(solution, move))
+                    for move in local_scheme.neighbors(solution))
+        best_cost = solution_pool.best_cost
+        move_best = None
+        delta_best = None
+        attributes_best = None
+        # Best move among the tabu ones, applied if all moves are tabu.
+        move_tabu_best = None
+        delta_tabu_best = None
+        attributes_tabu_best = None
+        for move, delta in moves_deltas:
+            if delta_best is not None and not delta < delta_best:
+                continue
+            attributes = move_attributes(solution, move)
+            is_tabu = False
+            for attribute in attributes:
+                if tabu.get(attribute, -1) >= number_of_iterations:
+                    is_tabu = True
+                    break
+            # Aspiration: a tabu move leading to a new best solution is
+            # allowed.
+            if is_tabu and not add_cost(cost, delta) < best_cost:
+                if delta_tabu_best is None or delta < delta_tabu_best:
+                    move_tabu_best = move
+                    delta_tabu_best = delta
+                    attributes_tabu_best = attributes
+                continue
+            move_best = move
+            delta_best = delta
+            attributes_best = attributes
+        if move_best is None:
+            move_best = move_tabu_best
+            delta_best = delta_tabu_best
+            attributes_best = attributes_tabu_best
+        profiler.add("neighborhood", time.perf_counter() - neighborhood_start)
+        if move_best is None:
+            termination.reason = "empty neighborhood"
+            break
+
+        # Apply the move and make its attributes tabu.
+        local_scheme.apply_move(solution, move_best)
+        cost = add_cost(cost, delta_best)
+        number_of_iterations += 1
+        for attribute in attributes_best:
+            tabu[attribute] = number_of_iterations + tenure
+        # Remove the attributes which are not tabu anymore once in a while,
+        # so that the tabu list doesn't keep growing.
+        if len(tabu) > 4 * maximum_tenure:
+            tabu = {
+                    attribute: end for attribute, end in tabu.items()
+                    if end >= number_of_iterations}
+
+        update_solution_pool(solution, cost, number_of_iterations)
+
+        # Adapt the tenure.
+        key = (cost, hash(solution_key(solution)))
+        last_visit = visited.get(key)
+        visited[key] = number_of_iterations
+        if last_visit is not None \
+                and number_of_iterations - last_visit <= 2 * maximum_tenure:
+            tenure = min(maximum_tenure, math.ceil(tenure * 1.1) + 1)
+            last_tenure_change = number_of_iterations
+        elif number_of_iterations - last_tenure_change \
+                >= tenure_decrease_period:
+            tenure = max(minimum_tenure, math.floor(tenure * 0.9))
+            last_tenure_change = number_of_iterations
+        if len(visited) > 4 * tenure_decrease_period + 8 * maximum_tenure:
+            visited = {
+                    key: iteration for key, iteration in visited.items()
+                    if number_of_iterations - iteration <= 2 * maximum_tenure}
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of iterations:        {number_of_iterations}")
+        print(f"Tenure:                      {tenure}")
+        print(f"Termination:                 {termination.reason}")
+    profiler.display(verbose)
+    if trace is not None:
+        trace.close()
+
+    end = time.time()
+
+    return {"solution_pool": solution_pool,
+            "number_of_iterations": number_of_iterations,
+            "tenure": tenure,
+            "termination": termination.reason,
+            "statistics": profiler.output(),
+            "trace": trace.output() if trace is not None else None,
+            "elapsed_time": end - start}
@@ -0,0 +1,61 @@
+import localsearchsolverpy
+from examples import knapsack
+from benchmarks.run import generate_knapsack_instance
+
+import os
+import tempfile
+import unittest
+
+
+class FailingLocalScheme(knapsack.LocalScheme):
+    """Local scheme whose local search fails after a few calls, in the first
+    process which creates 'lock_file' only."""
+
+    def __init__(self, instance, lock_file):
+        super().__init__(instance)
+        self.lock_file = lock_file
+        self.number_of_calls = 0
+
+    def local_search(self, solution, perturbation=None, deadline=None):
+        self.number_of_calls += 1
+        if self.number_of_calls == 20:
+            try:
+                os.close(os.open(
+                    self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                pass
+            else:
+                raise RuntimeError("local search failed")
+        super().local_search(solution, perturbation, deadline)
+
+
+class TestIslands(unittest.TestCase):
+
+    def test_seed(self):
+        local_scheme = knapsack.LocalScheme(generate_knapsack_instance(30, 0))
+        output = localsearchsolverpy.iterated_local_search(
+                local_scheme,
+                number_of_islands=2,
+                seed=3,
+                maximum_number_of_iterations=50,
+                verbose=False)
+        self.assertEqual(
+                output["termination"], "maximum number of iterations")
+        self.assertEqual(output["number_of_iterations"], 100)
+
+    def test_failing_island(self):
+        # Without a time limit, the other islands must be stopped once one
+        # of them fails.
+        with tempfile.TemporaryDirectory() as directory:
+            local_scheme = FailingLocalScheme(
+                    generate_knapsack_instance(30, 0),
+                    os.path.join(directory, "lock"))
+            with self.assertRaises(RuntimeError):
+                localsearchsolverpy.iterated_local_search(
+                        local_scheme,
+                        number_of_islands=2,
+                        verbose=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import localsearchsolverpy
+from examples import knapsack, travellingsalesman
+from benchmarks.run import generate_knapsack_instance
+from benchmarks.run import generate_travellingsalesman_instance
+
+import unittest
+
+
+class TestSolver(unittest.TestCase):
+
+    def test_memetic_algorithm(self):
+        # The solution pool created by 'Solver' has a single solution; it
+        # must not be used as the population.
+        for local_scheme in (
+                knapsack.LocalScheme(generate_knapsack_instance(50, 0)),
+                travellingsalesman.LocalScheme(
+                    generate_travellingsalesman_instance(30, 0))):
+            solver = localsearchsolverpy.Solver(
+                    localsearchsolverpy.memetic_algorithm,
+                    local_scheme,
+                    population_size=5,
+                    maximum_number_of_iterations=20,
+                    verbose=False)
+            solver.start()
+            output = solver.wait()
+            self.assertEqual(
+                    output["termination"], "maximum number of iterations")
+            self.assertEqual(output["number_of_iterations"], 20)
+            solution, cost = solver.best()
+            self.assertEqual(local_scheme.global_cost(solution), cost)
+            self.assertEqual(
+                    cost, output["solution_pool"].best_cost)
+
+
+if __name__ == "__main__":
+    unittest.main()